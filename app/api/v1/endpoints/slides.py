@@ -1,20 +1,34 @@
 import io
+import os
+from typing import Optional
 import pandas as pd
-from fastapi import APIRouter, UploadFile, File, Form, Depends, Request
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi import APIRouter, UploadFile, File, Form, Depends, Request, HTTPException
+from fastapi.responses import HTMLResponse, StreamingResponse, FileResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.templating import Jinja2Templates
 
 # Services
 from app.services.research_service import ResearchService
 from app.services.ppt_composer_service import PPTComposerService
-from app.services.google_slides_service import GoogleSlidesService
+from app.services.pptx_render_service import PptxRenderService
+from app.services.presentation_store import PresentationStore
+from app.services.job_service import JobService
 from app.services.slide_workflow_service import SlideWorkflowService
+from app.services.cost_estimator_service import CostEstimatorService
+from app.services.deck_build_service import DeckBuildService, DeckBuildRequest, InvalidCompositionError, parse_composition
 
 # Dependencies
 from app.core.dependencies import (
     get_research_service, 
     get_ppt_composer_service, 
-    get_google_slides_service
+    get_pptx_render_service,
+    get_presentation_store,
+    get_slide_renderer,
+    get_slides_write_scheduler,
+    get_job_service,
+    get_research_index_service,
+    get_cost_estimator_service,
+    SLIDE_RENDERERS
 )
 
 router = APIRouter()
@@ -31,15 +45,42 @@ async def process_a1_preview(
     audience: str = Form(...),
     learning_goals: str = Form(...),
     file: UploadFile = File(...),
+    presentation_id: Optional[str] = Form(None),
+    streaming: bool = Form(False),
+    draft: bool = Form(False),
+    use_index: bool = Form(True),
     research_service: ResearchService = Depends(get_research_service),
     composer_service: PPTComposerService = Depends(get_ppt_composer_service),
-    google_service: GoogleSlidesService = Depends(get_google_slides_service)
+    slide_service = Depends(get_slide_renderer),
+    presentation_store: PresentationStore = Depends(get_presentation_store)
 ):
     
     contents = await file.read()
     df = pd.read_csv(io.BytesIO(contents), encoding='utf-8-sig')
     
     goals_list = [g.strip() for g in learning_goals.split(",") if g.strip()]
+    presentation_id = (presentation_id or "").strip() or None
+
+    if streaming:
+        if presentation_id:
+            raise HTTPException(status_code=400, detail="ストリーミングモードでは差分更新を利用できません。")
+
+        return StreamingResponse(
+            SlideWorkflowService.run_streaming_pipeline(
+                df=df,
+                unit_no=unit_no,
+                unit_title=unit_title,
+                audience=audience,
+                goals_list=goals_list,
+                research_service=research_service,
+                composer_service=composer_service,
+                slide_service=slide_service,
+                presentation_store=presentation_store,
+                draft=draft,
+                use_index=use_index
+            ),
+            media_type="application/x-ndjson"
+        )
 
     return StreamingResponse(
         SlideWorkflowService.run_generation_pipeline(
@@ -50,7 +91,196 @@ async def process_a1_preview(
             goals_list=goals_list,
             research_service=research_service,
             composer_service=composer_service,
-            google_service=google_service
+            slide_service=slide_service,
+            presentation_id=presentation_id,
+            presentation_store=presentation_store,
+            draft=draft,
+            use_index=use_index
         ),
         media_type="application/x-ndjson"
-    )
\ No newline at end of file
+    )
+
+@router.post("/jobs")
+async def submit_generation_job(
+    unit_no: int = Form(...),
+    unit_title: str = Form(...),
+    audience: str = Form(...),
+    learning_goals: str = Form(...),
+    file: UploadFile = File(...),
+    output_format: str = Form("google"),
+    presentation_id: Optional[str] = Form(None),
+    streaming: bool = Form(False),
+    draft: bool = Form(False),
+    use_index: bool = Form(True),
+    job_service: JobService = Depends(get_job_service)
+):
+    if output_format not in SLIDE_RENDERERS:
+        raise HTTPException(status_code=400, detail=f"未対応の出力形式です: {output_format}")
+
+    presentation_id = (presentation_id or "").strip() or None
+    if streaming and presentation_id:
+        raise HTTPException(status_code=400, detail="ストリーミングモードでは差分更新を利用できません。")
+
+    params = {
+        "unit_no": unit_no,
+        "unit_title": unit_title,
+        "audience": audience,
+        "goals_list": [g.strip() for g in learning_goals.split(",") if g.strip()],
+        "output_format": output_format,
+        "presentation_id": presentation_id,
+        "streaming": streaming,
+        "draft": draft,
+        "use_index": use_index
+    }
+    job_id = job_service.submit(params, await file.read())
+
+    return {"job_id": job_id, "events_url": f"/api/v1/jobs/{job_id}/events"}
+
+@router.post("/research/upgrade")
+async def upgrade_draft_slides(
+    presentation_id: str = Form(...),
+    slide_ids: Optional[str] = Form(None),
+    research_service: ResearchService = Depends(get_research_service),
+    composer_service: PPTComposerService = Depends(get_ppt_composer_service),
+    presentation_store: PresentationStore = Depends(get_presentation_store)
+):
+    presentation_id = presentation_id.strip()
+    return StreamingResponse(
+        SlideWorkflowService.run_upgrade_pipeline(
+            presentation_id=presentation_id,
+            slide_ids=[s.strip() for s in (slide_ids or "").split(",") if s.strip()] or None,
+            research_service=research_service,
+            composer_service=composer_service,
+            slide_service=_stored_renderer(presentation_store, presentation_id),
+            presentation_store=presentation_store
+        ),
+        media_type="application/x-ndjson"
+    )
+
+@router.post("/research/regenerate")
+async def regenerate_slide(
+    slide_id: str = Form(...),
+    presentation_id: Optional[str] = Form(None),
+    job_id: Optional[str] = Form(None),
+    hints: Optional[str] = Form(None),
+    research: bool = Form(False),
+    research_service: ResearchService = Depends(get_research_service),
+    composer_service: PPTComposerService = Depends(get_ppt_composer_service),
+    presentation_store: PresentationStore = Depends(get_presentation_store),
+    job_service: JobService = Depends(get_job_service)
+):
+    presentation_id = (presentation_id or "").strip() or None
+    if not presentation_id and job_id:
+        presentation_id = (job_service.get_state(job_id.strip()) or {}).get("presentation_id")
+    if not presentation_id:
+        raise HTTPException(status_code=400, detail="presentation_id または完了済みの job_id を指定してください。")
+
+    return StreamingResponse(
+        SlideWorkflowService.run_regeneration_pipeline(
+            presentation_id=presentation_id,
+            slide_id=slide_id.strip(),
+            research_service=research_service,
+            composer_service=composer_service,
+            slide_service=_stored_renderer(presentation_store, presentation_id),
+            presentation_store=presentation_store,
+            hints=(hints or "").strip() or None,
+            research=research
+        ),
+        media_type="application/x-ndjson"
+    )
+
+def _stored_renderer(presentation_store: PresentationStore, presentation_id: str):
+    stored = presentation_store.load(presentation_id)
+    if not stored:
+        raise HTTPException(status_code=404, detail="保存された生成条件が見つかりません。")
+
+    output_format = stored.get("output_format", "google")
+    if output_format not in SLIDE_RENDERERS:
+        raise HTTPException(status_code=400, detail=f"未対応の出力形式です: {output_format}")
+    return SLIDE_RENDERERS[output_format]()
+
+@router.post("/decks")
+async def build_decks_from_composition(
+    body: DeckBuildRequest,
+    presentation_store: PresentationStore = Depends(get_presentation_store)
+):
+    if body.output_format not in SLIDE_RENDERERS:
+        raise HTTPException(status_code=400, detail=f"未対応の出力形式です: {body.output_format}")
+
+    compositions = []
+    for idx, raw in enumerate(body.compositions):
+        try:
+            compositions.append(parse_composition(raw))
+        except InvalidCompositionError as e:
+            raise HTTPException(status_code=400, detail=f"compositions[{idx}]: {e}")
+
+    deck_builder = DeckBuildService(SLIDE_RENDERERS[body.output_format], presentation_store)
+    return {"decks": await run_in_threadpool(deck_builder.build_many, compositions)}
+
+@router.get("/jobs/{job_id}")
+async def get_generation_job(job_id: str, job_service: JobService = Depends(get_job_service)):
+    state = job_service.get_state(job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="ジョブが見つかりません。")
+    return state
+
+@router.get("/jobs/{job_id}/events")
+async def stream_generation_job_events(
+    job_id: str,
+    since: int = 0,
+    job_service: JobService = Depends(get_job_service)
+):
+    if job_service.get_state(job_id) is None:
+        raise HTTPException(status_code=404, detail="ジョブが見つかりません。")
+
+    return StreamingResponse(
+        job_service.stream_events(job_id, since=max(0, since)),
+        media_type="application/x-ndjson"
+    )
+
+@router.get("/research/download/{file_id}")
+async def download_pptx(
+    file_id: str,
+    pptx_service: PptxRenderService = Depends(get_pptx_render_service)
+):
+    if not file_id.isalnum():
+        raise HTTPException(status_code=400, detail="無効なファイルIDです。")
+
+    path = pptx_service.get_file_path(file_id)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="ファイルが見つかりません。")
+
+    return FileResponse(
+        path,
+        media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+        filename=f"{file_id}.pptx"
+    )
+
+@router.get("/slides/queue")
+async def slides_queue_status():
+    return get_slides_write_scheduler().stats()
+
+@router.get("/research/index/stats")
+async def research_index_stats():
+    return get_research_index_service().summary()
+
+@router.post("/research/estimate")
+async def estimate_generation_cost(
+    file: UploadFile = File(...),
+    unit_no: Optional[int] = Form(None),
+    unit_title: Optional[str] = Form(None),
+    audience: str = Form(""),
+    learning_goals: str = Form(""),
+    streaming: bool = Form(False),
+    draft: bool = Form(False),
+    estimator: CostEstimatorService = Depends(get_cost_estimator_service)
+):
+    contents = await file.read()
+    df = pd.read_csv(io.BytesIO(contents), encoding='utf-8-sig')
+
+    unit_title = (unit_title or "").strip() or None
+    if (unit_no is None) != (unit_title is None):
+        raise HTTPException(status_code=400, detail="unit_no と unit_title は両方指定するか、両方省略してください。")
+
+    goals_list = [g.strip() for g in learning_goals.split(",") if g.strip()]
+    return estimator.estimate(df, unit_no, unit_title, audience, goals_list, streaming=streaming, draft=draft)
@@ -0,0 +1,45 @@
+# build_deck.py
+# 生成済みのスライド構成(final_composition の JSON、またはジョブのイベントログ)から LLM を使わずにデッキを作り直す。
+#   python -m app.build_deck composition1.json data/jobs/<job_id>/events.ndjson --output-format pptx
+import argparse
+import json
+import logging
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.core.config import settings
+from app.core.dependencies import SLIDE_RENDERERS, get_presentation_store
+from app.services.deck_build_service import DeckBuildService, InvalidCompositionError, load_composition_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build decks from saved slide compositions")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--output-format", choices=sorted(SLIDE_RENDERERS), default="google")
+    parser.add_argument("--workers", type=int, default=settings.DECK_BUILD_MAX_WORKERS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    compositions = []
+    for path in args.paths:
+        with open(path, encoding="utf-8-sig") as f:
+            try:
+                compositions.append(load_composition_text(f.read()))
+            except InvalidCompositionError as e:
+                parser.error(f"{path}: {e}")
+
+    deck_builder = DeckBuildService(SLIDE_RENDERERS[args.output_format], get_presentation_store(), args.workers)
+    results = deck_builder.build_many(compositions)
+    for path, result in zip(args.paths, results):
+        print(json.dumps({"path": path, **result}, ensure_ascii=False))
+
+    if any(r["status"] != "complete" for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from typing import List, Dict
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,6 +8,63 @@ class Settings(BaseSettings):
 
     CREDENTIALS_PATH: str = "credentials.json"
     TOKEN_PATH: str = "token.json"
+
+    RESEARCH_MODEL: str = "gpt-4o"
+    DESIGN_MODEL: str = "gpt-4o"
+    SUMMARY_MODEL: str = "gpt-4o"
+    DRAFT_MODEL: str = "gpt-4o-mini"
+    DRAFT_SKIP_RESEARCH: bool = True
+
+    LLM_MAX_WORKERS: int = 5
+    OPENAI_RPM: int = 500
+    OPENAI_TPM: int = 30000
+    OPENAI_OUTPUT_TOKENS_PER_SEC: float = 50.0
+
+    PPTX_OUTPUT_DIR: str = "output"
+    PRESENTATION_STORE_DIR: str = "data/presentations"
+
+    SLIDES_WRITE_QUOTA_PER_MINUTE: int = 60
+    SLIDES_READ_QUOTA_PER_MINUTE: int = 300
+    DRIVE_QUOTA_PER_MINUTE: int = 300
+    GOOGLE_API_MAX_RETRIES: int = 5
+    SLIDES_STREAM_BATCH_REQUESTS: int = 500
+
+    GOOGLE_HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    GOOGLE_HTTP_MAX_KEEPALIVE_PER_HOST: int = 20
+    GOOGLE_HTTP_TIMEOUT_SEC: float = 120.0
+    GOOGLE_HTTP2: bool = True
+
+    SLIDES_TEMPLATE_ID: str = ""
+    SLIDES_TEMPLATE_LAYOUTS: Dict[str, str] = {
+        "Cover": "COVER", "A": "LAYOUT_A", "B": "LAYOUT_B", "C": "LAYOUT_C", "D": "LAYOUT_D", "E": "LAYOUT_E"
+    }
+
+    DESIGN_PROMPT_FIELDS: List[str] = [
+        "unit_number", "unit_title", "slide_number", "slide_title",
+        "conclusion", "key_messages", "case_study", "pitfalls",
+        "action_item", "mini_work", "split_plan"
+    ]
+    DESIGN_PROMPT_MAX_CHARS: int = 300
+
+    JOBS_DIR: str = "data/jobs"
+    JOB_LOCAL_WORKERS: int = 2
+    JOB_HEARTBEAT_SEC: float = 5.0
+    JOB_STALE_AFTER_SEC: float = 60.0
+    JOB_MAX_ATTEMPTS: int = 2
+    JOB_RETENTION_HOURS: float = 72.0
+
+    STREAMING_WINDOW: int = 10
+
+    DECK_BUILD_MAX_WORKERS: int = 4
+
+    RESEARCH_INDEX_ENABLED: bool = True
+    RESEARCH_INDEX_PATH: str = "data/research_index.jsonl"
+    RESEARCH_INDEX_NGRAM: int = 2
+    RESEARCH_REUSE_THRESHOLD: float = 0.9
+    RESEARCH_ADAPT_THRESHOLD: float = 0.6
+    RESEARCH_ADAPT_MODEL: str = "gpt-4o-mini"
+    RESEARCH_TWO_TIER: bool = True
+    RESEARCH_TAILOR_MODEL: str = "gpt-4o-mini"
     
     class Config:
         env_file = ".env"
@@ -1,13 +1,85 @@
+from functools import lru_cache
+
+from fastapi import Form, HTTPException
+
 from app.core.config import settings
 from app.services.research_service import ResearchService
+from app.services.research_index_service import ResearchIndexService
 from app.services.ppt_composer_service import PPTComposerService
 from app.services.google_slides_service import GoogleSlidesService
+from app.services.google_slides_template_service import GoogleSlidesTemplateService
+from app.services.pptx_render_service import PptxRenderService
+from app.services.presentation_store import PresentationStore
+from app.services.job_service import JobService
+from app.services.slides_write_scheduler import SlidesWriteScheduler
+from app.services.google_http_transport import PooledHttpTransport, build_api
+from app.services.cost_estimator_service import CostEstimatorService
+
+@lru_cache
+def get_research_index_service() -> ResearchIndexService:
+    return ResearchIndexService()
 
 def get_research_service() -> ResearchService:
-    return ResearchService(api_key=settings.OPENAI_API_KEY)
+    index = get_research_index_service() if settings.RESEARCH_INDEX_ENABLED else None
+    return ResearchService(api_key=settings.OPENAI_API_KEY, index=index)
 
 def get_ppt_composer_service() -> PPTComposerService:
     return PPTComposerService(api_key=settings.OPENAI_API_KEY)
 
+@lru_cache
+def get_slides_write_scheduler() -> SlidesWriteScheduler:
+    return SlidesWriteScheduler(
+        quotas={
+            "slides_write": settings.SLIDES_WRITE_QUOTA_PER_MINUTE,
+            "slides_read": settings.SLIDES_READ_QUOTA_PER_MINUTE,
+            "drive": settings.DRIVE_QUOTA_PER_MINUTE
+        },
+        max_retries=settings.GOOGLE_API_MAX_RETRIES
+    )
+
+@lru_cache
+def get_google_http_transport() -> PooledHttpTransport:
+    return PooledHttpTransport(credentials=GoogleSlidesService._authenticate())
+
+# API クライアントはトランスポートがスレッドセーフなため、プロセス内のすべての実行で共有する
+@lru_cache
+def get_slides_api():
+    return build_api('slides', 'v1', get_google_http_transport())
+
+@lru_cache
+def get_drive_api():
+    return build_api('drive', 'v3', get_google_http_transport())
+
 def get_google_slides_service() -> GoogleSlidesService:
-    return GoogleSlidesService()
\ No newline at end of file
+    return GoogleSlidesService(scheduler=get_slides_write_scheduler(), service=get_slides_api())
+
+def get_google_slides_template_service() -> GoogleSlidesTemplateService:
+    return GoogleSlidesTemplateService(
+        scheduler=get_slides_write_scheduler(),
+        service=get_slides_api(),
+        drive_service=get_drive_api()
+    )
+
+def get_pptx_render_service() -> PptxRenderService:
+    return PptxRenderService()
+
+def get_presentation_store() -> PresentationStore:
+    return PresentationStore()
+
+SLIDE_RENDERERS = {
+    GoogleSlidesService.OUTPUT_FORMAT: get_google_slides_service,
+    GoogleSlidesTemplateService.OUTPUT_FORMAT: get_google_slides_template_service,
+    PptxRenderService.OUTPUT_FORMAT: get_pptx_render_service
+}
+
+def get_slide_renderer(output_format: str = Form("google")):
+    if output_format not in SLIDE_RENDERERS:
+        raise HTTPException(status_code=400, detail=f"未対応の出力形式です: {output_format}")
+    return SLIDE_RENDERERS[output_format]()
+
+def get_job_service() -> JobService:
+    return JobService()
+
+def get_cost_estimator_service() -> CostEstimatorService:
+    index = get_research_index_service() if settings.RESEARCH_INDEX_ENABLED else None
+    return CostEstimatorService(index=index)
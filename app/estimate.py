@@ -0,0 +1,43 @@
+# estimate.py
+# カリキュラム CSV から LLM 呼び出し回数・トークン数・費用・所要時間・Slides リクエスト数をオフラインで見積もる。
+#   python -m app.estimate curriculum.csv --unit-no 1 --unit-title "ビジネスマナー" --audience 新入社員 --goals "報連相,敬語"
+import argparse
+import json
+
+import pandas as pd
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.core.config import settings
+from app.services.cost_estimator_service import CostEstimatorService
+from app.services.research_index_service import ResearchIndexService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-flight cost and latency estimate for a curriculum CSV")
+    parser.add_argument("csv_path")
+    parser.add_argument("--unit-no", type=int)
+    parser.add_argument("--unit-title")
+    parser.add_argument("--audience", default="")
+    parser.add_argument("--goals", default="")
+    parser.add_argument("--streaming", action="store_true")
+    parser.add_argument("--draft", action="store_true", help="下書きモードで見積もる")
+    parser.add_argument("--no-index", action="store_true", help="過去の Research 結果の再利用を見込まない")
+    args = parser.parse_args()
+
+    if (args.unit_no is None) != (not args.unit_title):
+        parser.error("--unit-no and --unit-title must be given together")
+
+    df = pd.read_csv(args.csv_path, encoding="utf-8-sig")
+    goals_list = [g.strip() for g in args.goals.split(",") if g.strip()]
+    index = ResearchIndexService() if settings.RESEARCH_INDEX_ENABLED and not args.no_index else None
+
+    estimate = CostEstimatorService(index=index).estimate(
+        df, args.unit_no, args.unit_title, args.audience, goals_list, streaming=args.streaming, draft=args.draft
+    )
+    print(json.dumps(estimate, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,21 @@
 # main.py
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
 
 from app.api.v1.endpoints import slides 
+from app.services.job_service import JobService
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 前回の停止で取り残されたジョブを引き継ぐ
+    await run_in_threadpool(JobService().recover)
+    yield
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
@@ -0,0 +1,212 @@
+import math
+from typing import List, Dict, Any, Optional
+
+import pandas as pd
+
+from app.core.config import settings
+from app.services.ppt_composer_service import PPTComposerService
+from app.services.prompt_projection_service import PromptProjectionService, estimate_tokens
+from app.services.research_index_service import ResearchIndexService
+from app.services.research_service import ResearchService, SlideResponse, CORE_CONTEXT
+from app.services.slide_request_builder import SlideRequestBuilder
+
+# 1M トークンあたりの USD 単価 (入力, 出力)
+MODEL_PRICING_USD_PER_1M = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+# 1回あたりの平均出力トークン数(実測値からの概算)
+COMPLETION_TOKENS = {
+    "research": 900,
+    "core": 650,
+    "tailor": 300,
+    "adapt": 900,
+    "design": 500,
+    "summary": 250,
+}
+
+REQUEST_OVERHEAD_SEC = 1.0
+SLIDES_BATCH_LATENCY_SEC = 2.0
+SLIDES_SEC_PER_REQUEST = 0.002
+SAMPLE_TEXT = "具体的な業務シーンに沿って要点を簡潔にまとめた説明文です。"
+SAMPLE_LAYOUTS = [("A", 3), ("B", 2), ("C", 4), ("D", 3), ("E", 3)]
+
+
+# CSV から LLM 呼び出し回数・トークン数・所要時間・Slides リクエスト数をオフラインで見積もる。
+class CostEstimatorService:
+    def __init__(self, index: Optional[ResearchIndexService] = None):
+        self.index = index
+        self.projector = PromptProjectionService()
+        self.builder = SlideRequestBuilder()
+
+    def estimate(
+        self,
+        df: pd.DataFrame,
+        unit_no: Optional[int] = None,
+        unit_title: Optional[str] = None,
+        audience: str = "",
+        goals: Optional[List[str]] = None,
+        streaming: bool = False,
+        draft: bool = False
+    ) -> Dict[str, Any]:
+        goals = goals or []
+        if (unit_no is None) != (not unit_title):
+            raise ValueError("unit_no と unit_title は両方指定するか、両方省略してください。")
+        if unit_title:
+            units = [ResearchService.filter_dataframe(df, unit_no, unit_title)]
+        else:
+            units = [group for _, group in df.groupby(["unit_number", "unit_title"], sort=False)]
+
+        unit_estimates = [
+            self._estimate_unit(unit_df, audience, goals, streaming, draft)
+            for unit_df in units if not unit_df.empty
+        ]
+        return {"units": unit_estimates, **self._sum_units(unit_estimates)}
+
+    def _estimate_unit(self, unit_df: pd.DataFrame, audience: str, goals: List[str], streaming: bool, draft: bool) -> Dict[str, Any]:
+        rows = unit_df.to_dict(orient="records")
+        first = rows[0]
+
+        calls = {"research": 0, "adapt": 0, "reuse": 0, "tailor": 0, "design": len(rows), "summary": 1}
+        prompt = {"research": 0, "adapt": 0, "tailor": 0, "design": 0, "summary": 0}
+
+        research_system = estimate_tokens(ResearchService.SYSTEM_INSTRUCTION)
+        design_system = estimate_tokens(PPTComposerService.SYSTEM_PROMPT)
+        skip_research = draft and settings.DRAFT_SKIP_RESEARCH
+        two_tier = settings.RESEARCH_TWO_TIER and not draft and self.index is not None
+        research_payload_cap = 0 if skip_research else self._research_payload_cap()
+        per_call = dict(COMPLETION_TOKENS, research=COMPLETION_TOKENS["core" if two_tier else "research"])
+
+        for row in rows:
+            title = str(row.get("slide_title", ""))
+            user = f"Title: {title}\nAudience: {audience}\nGoals: {', '.join(goals)}"
+            if skip_research:
+                kind = None
+            elif draft:
+                kind = "research"
+            else:
+                kind = self._research_kind(title, CORE_CONTEXT if two_tier else ResearchService.context_key(audience, goals))
+            if kind:
+                calls[kind] += 1
+            if kind == "research":
+                prompt["research"] += research_system + estimate_tokens(user)
+            elif kind == "adapt":
+                prompt["adapt"] += research_system + estimate_tokens(user) + per_call["research"]
+            if two_tier:
+                # 受講者向けの調整は共通部分の再利用有無にかかわらず毎回行う
+                calls["tailor"] += 1
+                prompt["tailor"] += research_system + estimate_tokens(user) + per_call["research"]
+
+            design_user = f"スライドを2枚構成して。データ: {self.projector.render(row)}"
+            prompt["design"] += design_system + estimate_tokens(design_user) + research_payload_cap
+
+        prompt["summary"] = design_system + estimate_tokens(PPTComposerService.SUMMARY_PROMPT)
+
+        completion = {kind: calls[kind] * per_call[kind] for kind in prompt}
+        models = {
+            "research": settings.DRAFT_MODEL if draft else settings.RESEARCH_MODEL,
+            "adapt": settings.RESEARCH_ADAPT_MODEL,
+            "tailor": settings.RESEARCH_TAILOR_MODEL,
+            "design": settings.DRAFT_MODEL if draft else settings.DESIGN_MODEL,
+            "summary": settings.DRAFT_MODEL if draft else settings.SUMMARY_MODEL,
+        }
+        cost = sum(self._cost(models[kind], prompt[kind], completion[kind]) for kind in prompt)
+
+        slides = self._estimate_slides(first, rows, streaming)
+
+        research_calls = calls["research"] + calls["adapt"] + calls["tailor"]
+        research_completion = completion["research"] + completion["adapt"] + completion["tailor"]
+        research_sec = self._stage_seconds(
+            research_calls,
+            prompt["research"] + prompt["adapt"] + prompt["tailor"] + research_completion,
+            research_completion / research_calls if research_calls else 0
+        )
+        design_sec = self._stage_seconds(calls["design"], prompt["design"] + completion["design"], COMPLETION_TOKENS["design"])
+        summary_sec = self._stage_seconds(1, prompt["summary"] + completion["summary"], COMPLETION_TOKENS["summary"])
+        wall = {
+            "research": round(research_sec, 1),
+            "design": round(design_sec, 1),
+            "summary": round(summary_sec, 1),
+            "slides": round(slides.pop("seconds"), 1),
+        }
+        wall["total"] = round(sum(wall.values()), 1)
+
+        return {
+            "unit_number": first.get("unit_number"),
+            "unit_title": first.get("unit_title"),
+            "topics": len(rows),
+            "calls": {**calls, "llm_total": research_calls + calls["design"] + calls["summary"]},
+            "tokens": {
+                "prompt": sum(prompt.values()),
+                "completion": sum(completion.values()),
+            },
+            "models": models,
+            "cost_usd": round(cost, 4),
+            "wall_time_sec": wall,
+            "slides": slides,
+        }
+
+    def _research_kind(self, title: str, context: str) -> str:
+        if self.index is None:
+            return "research"
+        score, entry = self.index.lookup(title, context)
+        if entry is not None and score >= settings.RESEARCH_REUSE_THRESHOLD:
+            return "reuse"
+        if entry is not None and score >= settings.RESEARCH_ADAPT_THRESHOLD:
+            return "adapt"
+        return "research"
+
+    def _research_payload_cap(self) -> int:
+        research_fields = [f for f in self.projector.fields if f in SlideResponse.model_fields]
+        cap = len(research_fields) * estimate_tokens(SAMPLE_TEXT[0] * self.projector.max_chars)
+        return min(COMPLETION_TOKENS["research"], cap)
+
+    def _stage_seconds(self, calls: int, tokens: int, completion_per_call: int) -> float:
+        if calls == 0:
+            return 0.0
+        latency = REQUEST_OVERHEAD_SEC + completion_per_call / settings.OPENAI_OUTPUT_TOKENS_PER_SEC
+        concurrency_bound = math.ceil(calls / settings.LLM_MAX_WORKERS) * latency
+        rate_bound = max(calls / settings.OPENAI_RPM, tokens / settings.OPENAI_TPM) * 60
+        return max(concurrency_bound, rate_bound)
+
+    def _estimate_slides(self, first: Dict[str, Any], rows: List[Dict[str, Any]], streaming: bool) -> Dict[str, Any]:
+        cover = {
+            "slide_id": "0-0", "type": "表紙", "title": "Cover", "layout_type": "Cover",
+            "text_content": [f"Unit {first.get('unit_number', '1')}", str(first.get("unit_title", "")), ""]
+        }
+        requests = len(self.builder.generate_slide_requests(cover))
+
+        per_layout = []
+        for layout_type, count in SAMPLE_LAYOUTS:
+            sample = {
+                "slide_id": "1-1", "type": "本文", "title": "sample", "subtitle": SAMPLE_TEXT,
+                "text_content": [SAMPLE_TEXT] * count, "layout_type": layout_type
+            }
+            per_layout.append(len(self.builder.generate_slide_requests(sample)))
+        avg_per_slide = sum(per_layout) / len(per_layout)
+
+        pages = 2 * len(rows) + 2
+        requests += int(round(avg_per_slide * (pages - 1)))
+
+        batches = math.ceil(requests / settings.SLIDES_STREAM_BATCH_REQUESTS) if streaming else 1
+        write_operations = 1 + batches
+        quota_sec = max(0, write_operations - settings.SLIDES_WRITE_QUOTA_PER_MINUTE) * 60 / settings.SLIDES_WRITE_QUOTA_PER_MINUTE
+        seconds = write_operations * SLIDES_BATCH_LATENCY_SEC + requests * SLIDES_SEC_PER_REQUEST + quota_sec
+
+        return {"pages": pages, "requests": requests, "write_operations": write_operations, "seconds": seconds}
+
+    def _cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        price_in, price_out = MODEL_PRICING_USD_PER_1M.get(model, MODEL_PRICING_USD_PER_1M["gpt-4o"])
+        return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+    def _sum_units(self, units: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "topics": sum(u["topics"] for u in units),
+            "llm_calls": sum(u["calls"]["llm_total"] for u in units),
+            "prompt_tokens": sum(u["tokens"]["prompt"] for u in units),
+            "completion_tokens": sum(u["tokens"]["completion"] for u in units),
+            "cost_usd": round(sum(u["cost_usd"] for u in units), 4),
+            "wall_time_sec": round(sum(u["wall_time_sec"]["total"] for u in units), 1),
+            "slides_requests": sum(u["slides"]["requests"] for u in units),
+        }
@@ -0,0 +1,108 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from app.core.config import settings
+from app.services.ppt_composer_service import ComposedSlideItem
+from app.services.presentation_store import PresentationStore
+
+logger = logging.getLogger(__name__)
+
+COMPOSITION_ADAPTER = TypeAdapter(List[ComposedSlideItem])
+
+
+class InvalidCompositionError(ValueError):
+    pass
+
+
+class DeckBuildRequest(BaseModel):
+    compositions: List[Any]
+    output_format: str = "google"
+
+
+def parse_composition(raw: Any) -> List[Dict[str, Any]]:
+    # final_composition の配列、complete イベント({"data": [...]})、{"slides": [...]} のいずれも受け付ける
+    if isinstance(raw, dict):
+        raw = raw.get("data", raw.get("slides"))
+    if not isinstance(raw, list) or not raw:
+        raise InvalidCompositionError("スライドの配列が見つかりません。")
+
+    try:
+        slides = COMPOSITION_ADAPTER.validate_python(raw)
+    except ValidationError as e:
+        raise InvalidCompositionError(str(e))
+
+    slide_ids = [s.slide_id for s in slides]
+    duplicates = sorted({sid for sid in slide_ids if slide_ids.count(sid) > 1})
+    if duplicates:
+        raise InvalidCompositionError(f"slide_id が重複しています: {', '.join(duplicates)}")
+
+    return [s.model_dump(exclude_none=True) for s in slides]
+
+
+def load_composition_text(text: str) -> List[Dict[str, Any]]:
+    # JSON ファイルに加え、ジョブのイベントログ(NDJSON)からは最後の complete イベントを使う
+    try:
+        return parse_composition(json.loads(text))
+    except json.JSONDecodeError:
+        pass
+
+    last_complete = None
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            raise InvalidCompositionError("JSON として読み込めません。")
+        if isinstance(event, dict) and event.get("status") == "complete" and isinstance(event.get("data"), list):
+            last_complete = event
+    if last_complete is None:
+        raise InvalidCompositionError("complete イベントが見つかりません。")
+    return parse_composition(last_complete)
+
+
+# 検証済みのスライド構成から LLM を呼び出さずにデッキを作成する。複数デッキは並行して作成する。
+class DeckBuildService:
+    def __init__(
+        self,
+        renderer_factory: Callable[[], Any],
+        presentation_store: Optional[PresentationStore] = None,
+        max_workers: int = None
+    ):
+        self.renderer_factory = renderer_factory
+        self.presentation_store = presentation_store
+        self.max_workers = max_workers or settings.DECK_BUILD_MAX_WORKERS
+
+    def build_many(self, compositions: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        if not compositions:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(compositions))) as executor:
+            return list(executor.map(self._build_one, range(len(compositions)), compositions))
+
+    def _build_one(self, index: int, composition: List[Dict[str, Any]]) -> Dict[str, Any]:
+        # 書き込み統計を実行ごとに分けるため、レンダラーはデッキごとに作成する
+        try:
+            renderer = self.renderer_factory()
+            pres_id, pres_url = renderer.create_presentation_from_json(composition)
+        except Exception as e:
+            logger.error(f"Deck build failed (#{index}): {e}", exc_info=True)
+            return {"index": index, "status": "error", "message": f"デッキの作成に失敗しました: {e}"}
+
+        if not pres_id:
+            return {"index": index, "status": "error", "message": pres_url}
+
+        if self.presentation_store:
+            self.presentation_store.save(pres_id, composition=composition, output_format=renderer.OUTPUT_FORMAT)
+
+        return {
+            "index": index,
+            "status": "complete",
+            "presentation_id": pres_id,
+            "url": pres_url,
+            "output_format": renderer.OUTPUT_FORMAT,
+            "slides": len(composition)
+        }
@@ -0,0 +1,137 @@
+import logging
+import threading
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httplib2
+import httpx
+from google.auth.transport.requests import Request
+from googleapiclient.discovery import build
+
+from app.core.config import settings
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+REFRESH_STATUS = (401,)
+
+
+# googleapiclient の http 引数に渡せる httplib2 互換のトランスポート。
+# httpx.Client をホストごとに1つ保持してコネクションを再利用し、複数スレッドから同時に呼び出せる。
+class PooledHttpTransport:
+    def __init__(
+        self,
+        credentials=None,
+        max_connections_per_host: Optional[int] = None,
+        max_keepalive_per_host: Optional[int] = None,
+        timeout: Optional[float] = None,
+        http2: Optional[bool] = None
+    ):
+        self.credentials = credentials
+        self.max_connections_per_host = max_connections_per_host or settings.GOOGLE_HTTP_MAX_CONNECTIONS_PER_HOST
+        self.max_keepalive_per_host = max_keepalive_per_host or settings.GOOGLE_HTTP_MAX_KEEPALIVE_PER_HOST
+        self.timeout = timeout or settings.GOOGLE_HTTP_TIMEOUT_SEC
+        self.http2 = HTTP2_AVAILABLE and (settings.GOOGLE_HTTP2 if http2 is None else http2)
+
+        self._clients: Dict[str, httpx.Client] = {}
+        self._clients_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def request(
+        self,
+        uri: str,
+        method: str = "GET",
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        redirections: int = 5,
+        connection_type=None
+    ) -> Tuple[httplib2.Response, bytes]:
+        client = self._client_for(uri)
+        headers = dict(headers or {})
+
+        self._ensure_valid()
+        token = self._apply_credentials(headers)
+        response = client.request(method, uri, content=body, headers=headers)
+
+        # 失効したトークンで拒否された場合は、更新して1回だけ再送する
+        if response.status_code in REFRESH_STATUS and self.credentials is not None:
+            self._refresh(stale_token=token)
+            self._apply_credentials(headers)
+            response = client.request(method, uri, content=body, headers=headers)
+
+        return self._to_httplib2(response), response.content
+
+    def close(self) -> None:
+        with self._clients_lock:
+            clients, self._clients = self._clients, {}
+        for client in clients.values():
+            client.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._clients_lock:
+            hosts = sorted(self._clients)
+        return {
+            "hosts": hosts,
+            "http2": self.http2,
+            "max_connections_per_host": self.max_connections_per_host
+        }
+
+    def _client_for(self, uri: str) -> httpx.Client:
+        parts = urlsplit(uri)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        client = self._clients.get(origin)
+        if client is not None:
+            return client
+
+        with self._clients_lock:
+            client = self._clients.get(origin)
+            if client is None:
+                client = httpx.Client(
+                    http2=self.http2,
+                    timeout=self.timeout,
+                    follow_redirects=True,
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections_per_host,
+                        max_keepalive_connections=self.max_keepalive_per_host
+                    )
+                )
+                self._clients[origin] = client
+            return client
+
+    def _ensure_valid(self) -> None:
+        if self.credentials is None or self.credentials.valid:
+            return
+        self._refresh(stale_token=getattr(self.credentials, "token", None))
+
+    def _refresh(self, stale_token: Optional[str]) -> None:
+        with self._refresh_lock:
+            # 待っている間に他スレッドが更新済みなら何もしない
+            if self.credentials.valid and getattr(self.credentials, "token", None) != stale_token:
+                return
+            logger.info("Refreshing Google API credentials")
+            self.credentials.refresh(Request())
+
+    def _apply_credentials(self, headers: Dict[str, str]) -> Optional[str]:
+        if self.credentials is None:
+            return None
+        with self._refresh_lock:
+            self.credentials.apply(headers)
+            return getattr(self.credentials, "token", None)
+
+    @staticmethod
+    def _to_httplib2(response: httpx.Response) -> httplib2.Response:
+        info = {key: value for key, value in response.headers.items()}
+        info["status"] = str(response.status_code)
+        resp = httplib2.Response(info)
+        resp.reason = response.reason_phrase
+        return resp
+
+
+def build_api(service_name: str, version: str, transport: PooledHttpTransport, **kwargs):
+    # ディスカバリ文書はライブラリ同梱のものを使い、起動時の通信を避ける
+    return build(service_name, version, http=transport, static_discovery=True, **kwargs)
@@ -0,0 +1,142 @@
+from typing import List, Dict, Any, Optional
+
+from googleapiclient.discovery import build
+
+from app.core.config import settings
+from app.services.google_slides_service import GoogleSlidesService
+from app.services.slides_write_scheduler import SlidesWriteScheduler
+
+LAYOUT_FIELDS = 'slides(objectId),layouts(objectId,layoutProperties(name,displayName),pageElements(objectId,shape(placeholder)))'
+TITLE_TYPES = ('TITLE', 'CENTERED_TITLE')
+FILLED_SLOTS = ('TITLE', 'SUBTITLE', 'BODY')
+
+
+# 表紙と A〜E のレイアウトを持つテンプレートをコピーし、レイアウトのプレースホルダーにテキストを流し込む。
+# 背景・図形・書式はテンプレート側で定義するため、スライドごとのスタイル指定リクエストが不要になる。
+class GoogleSlidesTemplateService(GoogleSlidesService):
+    OUTPUT_FORMAT = "google_template"
+
+    def __init__(
+        self,
+        scheduler: Optional[SlidesWriteScheduler] = None,
+        service=None,
+        drive_service=None,
+        template_id: Optional[str] = None
+    ):
+        # Slides と Drive のクライアントは同じ認証情報から作成する
+        credentials = self._authenticate() if service is None or drive_service is None else None
+        super().__init__(scheduler=scheduler, service=service or build('slides', 'v1', credentials=credentials))
+        self.drive = drive_service or build('drive', 'v3', credentials=credentials)
+        self.template_id = template_id or settings.SLIDES_TEMPLATE_ID
+        self.layouts: Dict[str, Dict[str, Any]] = {}
+
+    def create_presentation_from_json(self, slide_data: list):
+        if not slide_data or not isinstance(slide_data, list):
+            return None, "有効なスライドデータがありません。"
+
+        handle = self.begin_presentation(self.presentation_title(slide_data))
+        self.append_slides(handle, slide_data)
+        return self.finish_presentation(handle)
+
+    def begin_presentation(self, title: str) -> Dict:
+        if not self.template_id:
+            raise ValueError("SLIDES_TEMPLATE_ID が設定されていません。")
+
+        copied = self._execute(
+            self.drive.files().copy(fileId=self.template_id, body={'name': title}, fields='id'),
+            kind='drive',
+            idempotent=False
+        )
+        presentation_id = copied['id']
+        presentation = self._load_layouts(presentation_id)
+
+        # テンプレートに含まれる見本スライドは削除する
+        return {
+            'presentation_id': presentation_id,
+            'pending': [{'deleteObject': {'objectId': s['objectId']}} for s in presentation.get('slides', [])],
+            'slide_count': 0
+        }
+
+    def update_presentation_from_json(self, presentation_id: str, slide_data: list, previous_composition: Optional[list] = None):
+        if not self.layouts:
+            self._load_layouts(presentation_id)
+        return super().update_presentation_from_json(presentation_id, slide_data, previous_composition)
+
+    def _load_layouts(self, presentation_id: str) -> Dict[str, Any]:
+        presentation = self._execute(
+            self.service.presentations().get(presentationId=presentation_id, fields=LAYOUT_FIELDS),
+            kind='slides_read'
+        )
+
+        by_name = {}
+        for layout in presentation.get('layouts', []):
+            placeholders = [
+                {'objectId': el['objectId'], **el['shape']['placeholder']}
+                for el in layout.get('pageElements', [])
+                if el.get('shape', {}).get('placeholder')
+            ]
+            info = {'objectId': layout['objectId'], 'placeholders': placeholders}
+            props = layout.get('layoutProperties', {})
+            for name in (props.get('displayName'), props.get('name')):
+                if name:
+                    by_name.setdefault(name, info)
+
+        self.layouts = {}
+        for key, name in settings.SLIDES_TEMPLATE_LAYOUTS.items():
+            if name not in by_name:
+                raise ValueError(f"テンプレートにレイアウト '{name}' ({key}) がありません。")
+            self.layouts[key] = by_name[name]
+        return presentation
+
+    def generate_slide_requests(self, item: Dict) -> List[Dict]:
+        page_id = self._page_object_id(item)
+        is_cover = item['type'] == '表紙'
+        layout = self.layouts['Cover' if is_cover else item.get('layout_type', 'C')]
+
+        mappings = []
+        slots = {}
+        for ph in layout['placeholders']:
+            ph_type = ph.get('type', 'BODY')
+            slot = 'TITLE' if ph_type in TITLE_TYPES else ph_type
+            if slot not in FILLED_SLOTS:
+                continue
+            index = ph.get('index', 0)
+            object_id = f"{page_id}_{ph_type.lower()}{index}"
+            mappings.append({'layoutPlaceholder': {'type': ph_type, 'index': index}, 'objectId': object_id})
+            slots.setdefault(slot, []).append((index, object_id))
+        for slot_ids in slots.values():
+            slot_ids.sort()
+
+        requests = [{'createSlide': {
+            'objectId': page_id,
+            'slideLayoutReference': {'layoutId': layout['objectId']},
+            'placeholderIdMappings': mappings
+        }}]
+
+        texts = item.get('text_content', [])
+        if is_cover:
+            unit_text, main_title, sub_title = (list(texts) + ["", "", ""])[:3]
+            fills = {'TITLE': [main_title], 'SUBTITLE': [unit_text.upper()], 'BODY': [sub_title]}
+        else:
+            body = list(texts)
+            if item.get('supplement'):
+                body.append(item['supplement'])
+            fills = {'TITLE': [item.get('title', '')], 'SUBTITLE': [item.get('subtitle', '')], 'BODY': body}
+
+        for slot, slot_ids in slots.items():
+            values = self._distribute(fills.get(slot, []), len(slot_ids))
+            for (_, object_id), text in zip(slot_ids, values):
+                text = str(text or '').strip()
+                if text:
+                    requests.append({'insertText': {'objectId': object_id, 'text': text}})
+                else:
+                    # 空のプレースホルダーは表示用のヒント文が残るため削除する
+                    requests.append({'deleteObject': {'objectId': object_id}})
+        return requests
+
+    def _distribute(self, values: List[str], slots: int) -> List[str]:
+        # プレースホルダーが足りない場合は残りを最後の枠にまとめる
+        values = [v for v in values if str(v or '').strip()]
+        if len(values) <= slots:
+            return values + [''] * (slots - len(values))
+        return values[:slots - 1] + ['\n'.join(values[slots - 1:])]
@@ -0,0 +1,408 @@
+import asyncio
+import io
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Optional, List, AsyncGenerator
+
+import pandas as pd
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+# 生成処理を HTTP 接続から切り離して実行するジョブ管理。
+# ジョブごとに jobs_dir/<job_id>/ に入力・状態・追記専用のイベントログ(events.ndjson)を保存する。
+class JobService:
+    _executor: Optional[ProcessPoolExecutor] = None
+    _executor_lock = threading.Lock()
+    _last_cleanup: float = 0.0
+
+    def __init__(self, jobs_dir: str = None):
+        self.jobs_dir = jobs_dir or settings.JOBS_DIR
+
+    def submit(self, params: Dict[str, Any], csv_bytes: bytes) -> str:
+        self._cleanup_if_due()
+
+        job_id = uuid.uuid4().hex
+        job_dir = os.path.join(self.jobs_dir, job_id)
+        os.makedirs(job_dir, exist_ok=True)
+
+        with open(os.path.join(job_dir, "input.csv"), "wb") as f:
+            f.write(csv_bytes)
+        with open(os.path.join(job_dir, "params.json"), "w", encoding="utf-8") as f:
+            json.dump(params, f, ensure_ascii=False)
+        open(os.path.join(job_dir, "events.ndjson"), "a").close()
+        _write_state(job_dir, {"job_id": job_id, "status": "queued", "created_at": time.time()})
+
+        if settings.JOB_LOCAL_WORKERS > 0:
+            self._submit_local(job_id)
+        return job_id
+
+    def get_state(self, job_id: str) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self._job_dir(job_id), "state.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def list_queued(self) -> List[str]:
+        queued = []
+        for job_id in self._job_ids():
+            state = self.get_state(job_id)
+            if state and state.get("status") == "queued":
+                queued.append((state.get("created_at", 0), job_id))
+        return [job_id for _, job_id in sorted(queued)]
+
+    def recover(self, resubmit: bool = None) -> Dict[str, int]:
+        # 起動時に呼び出す。ハートビートが途絶えたジョブを再投入(試行回数の上限を超えたら失敗)し、
+        # 前回のプロセスのプールに積まれたまま失われた待機中ジョブを自プロセスのプールへ投入し直す
+        if resubmit is None:
+            resubmit = settings.JOB_LOCAL_WORKERS > 0
+        stats = {"removed": self.cleanup(), "requeued": 0, "failed": 0, "resubmitted": 0}
+
+        for job_id in self._job_ids():
+            status = (self.get_state(job_id) or {}).get("status")
+            if status in ("queued", "running") and os.path.exists(_lock_path(self._job_dir(job_id))):
+                status = self._recover_stale(job_id, requeue=True) or status
+                if status == "failed":
+                    stats["failed"] += 1
+                elif status == "queued":
+                    stats["requeued"] += 1
+
+            if status == "queued" and resubmit and not os.path.exists(_lock_path(self._job_dir(job_id))):
+                self._submit_local(job_id)
+                stats["resubmitted"] += 1
+
+        if any(stats.values()):
+            logger.info(f"Recovered jobs: {stats}")
+        return stats
+
+    def recover_lost(self, job_id: str) -> Optional[str]:
+        # プールが壊れて BrokenProcessPool で終わったジョブを復旧する。
+        # ロックを持つのがこのプロセスのプールのワーカーなら、そのワーカーは既に終了しているため
+        # ハートビートの途絶を待たずに再投入する。ロックがなければ待機中のままなので状態だけ返す
+        job_dir = self._job_dir(job_id)
+        status = (self.get_state(job_id) or {}).get("status")
+        if status in TERMINAL_STATUSES:
+            return status
+        if not os.path.exists(_lock_path(job_dir)):
+            return status
+        if not _claimed_by_child(job_dir):
+            return None
+        return self._recover_stale(job_id, requeue=True, force=True)
+
+    def cleanup(self) -> int:
+        # 終了から JOB_RETENTION_HOURS を過ぎたジョブのディレクトリを削除する
+        cutoff = time.time() - settings.JOB_RETENTION_HOURS * 3600
+        removed = 0
+        for job_id in self._job_ids():
+            job_dir = self._job_dir(job_id)
+            try:
+                state = self.get_state(job_id)
+                if state is None:
+                    expired = os.path.getmtime(job_dir) < cutoff
+                else:
+                    expired = state.get("status") in TERMINAL_STATUSES and state.get("finished_at", 0) < cutoff
+            except (OSError, ValueError):
+                continue
+            if expired:
+                shutil.rmtree(job_dir, ignore_errors=True)
+                removed += 1
+        JobService._last_cleanup = time.time()
+        return removed
+
+    async def stream_events(self, job_id: str, since: int = 0, poll_interval: float = 0.5) -> AsyncGenerator[str, None]:
+        path = os.path.join(self._job_dir(job_id), "events.ndjson")
+        seq = 0
+        offset = 0
+
+        while True:
+            status, chunk = await asyncio.to_thread(self._read_events, job_id, path, offset)
+
+            # 書き込み途中の行は次回に読む
+            complete_part = chunk[:chunk.rfind(b"\n") + 1]
+            offset += len(complete_part)
+
+            for line in complete_part.decode("utf-8").splitlines():
+                if not line.strip():
+                    continue
+                if seq >= since:
+                    yield line + "\n"
+                seq += 1
+
+            if not complete_part:
+                if status in TERMINAL_STATUSES:
+                    return
+                if status == "running" and settings.JOB_LOCAL_WORKERS > 0:
+                    # ワーカーが停止している場合は試行回数の上限まで自プロセスのプールで再実行する。
+                    # 上限を超えるとエラーイベントが記録され、それを配信して終了する。
+                    # 別プロセスのワーカーで実行している場合は、その recover() に任せて待ち続ける
+                    if await asyncio.to_thread(self._recover_stale, job_id, True) == "queued":
+                        self._submit_local(job_id)
+                await asyncio.sleep(poll_interval)
+
+    def _read_events(self, job_id: str, path: str, offset: int):
+        # 終了状態はイベントをすべて書き終えてから記録されるため、読み込み前に確認する
+        status = (self.get_state(job_id) or {}).get("status")
+        with open(path, "rb") as f:
+            f.seek(offset)
+            return status, f.read()
+
+    def _recover_stale(self, job_id: str, requeue: bool, force: bool = False) -> Optional[str]:
+        job_dir = self._job_dir(job_id)
+        lock_path = _lock_path(job_dir)
+        try:
+            if not force and time.time() - os.path.getmtime(lock_path) < settings.JOB_STALE_AFTER_SEC:
+                return None
+            # 他のプロセスと同時に復旧しないよう、ロックの退避に成功した側だけが処理する
+            stale_path = f"{lock_path}.{uuid.uuid4().hex}.stale"
+            os.rename(lock_path, stale_path)
+        except FileNotFoundError:
+            return None
+
+        state = _read_state(job_dir)
+        event_log = _EventLog(job_dir)
+        if requeue and state.get("attempts", 1) < settings.JOB_MAX_ATTEMPTS:
+            event_log.append({"status": "progress", "message": "ワーカーが停止したため、ジョブを再実行します···", "percent": 0})
+            state.update({"status": "queued", "requeued_at": time.time()})
+        else:
+            event_log.append({"status": "error", "message": "ワーカーからの応答が途絶えたため、ジョブを中断しました。"})
+            state.update({"status": "failed", "finished_at": time.time()})
+        _write_state(job_dir, state)
+        os.remove(stale_path)
+
+        logger.warning(f"Job {job_id} lost its worker, marked as {state['status']}")
+        return state["status"]
+
+    def _cleanup_if_due(self) -> None:
+        if time.time() - JobService._last_cleanup >= 3600:
+            self.cleanup()
+
+    def _job_ids(self) -> List[str]:
+        if not os.path.isdir(self.jobs_dir):
+            return []
+        return [name for name in os.listdir(self.jobs_dir) if os.path.isdir(os.path.join(self.jobs_dir, name))]
+
+    def _job_dir(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, "".join(c for c in job_id if c.isalnum()))
+
+    def _submit_local(self, job_id: str) -> None:
+        executor = self._get_executor()
+        try:
+            future = executor.submit(run_job, self.jobs_dir, job_id)
+        except BrokenProcessPool:
+            logger.warning("Job worker pool is broken, recreating it")
+            future = self._get_executor(broken=executor).submit(run_job, self.jobs_dir, job_id)
+        future.add_done_callback(lambda f: self._on_local_done(job_id, f))
+
+    def _on_local_done(self, job_id: str, future: Future) -> None:
+        if future.cancelled() or not isinstance(future.exception(), BrokenProcessPool):
+            return
+        # ワーカーが異常終了するとプール全体が使えなくなるため、新しいプールで実行し直す
+        if self.recover_lost(job_id) == "queued":
+            self._submit_local(job_id)
+
+    @classmethod
+    def _get_executor(cls, broken: Optional[ProcessPoolExecutor] = None) -> ProcessPoolExecutor:
+        with cls._executor_lock:
+            if cls._executor is not None and cls._executor is broken:
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+                cls._executor = None
+            if cls._executor is None:
+                cls._executor = create_worker_pool(settings.JOB_LOCAL_WORKERS)
+            return cls._executor
+
+
+def create_worker_pool(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(workers,)
+    )
+
+
+def _init_worker(workers: int) -> None:
+    # Google API のクォータはプロセスごとのスケジューラで計測するため、ワーカー数で等分する
+    settings.SLIDES_WRITE_QUOTA_PER_MINUTE = max(1, settings.SLIDES_WRITE_QUOTA_PER_MINUTE // workers)
+    settings.SLIDES_READ_QUOTA_PER_MINUTE = max(1, settings.SLIDES_READ_QUOTA_PER_MINUTE // workers)
+    settings.DRIVE_QUOTA_PER_MINUTE = max(1, settings.DRIVE_QUOTA_PER_MINUTE // workers)
+
+
+def run_job(jobs_dir: str, job_id: str) -> None:
+    job_dir = os.path.join(jobs_dir, job_id)
+    if not _claim(job_dir):
+        return
+
+    heartbeat = _Heartbeat(_lock_path(job_dir))
+    heartbeat.start()
+
+    state = _read_state(job_dir)
+    state.update({
+        "status": "running",
+        "started_at": time.time(),
+        "pid": os.getpid(),
+        "attempts": state.get("attempts", 0) + 1
+    })
+    _write_state(job_dir, state)
+
+    event_log = _EventLog(job_dir)
+    last_event = {}
+    try:
+        last_event = asyncio.run(_run_pipeline(job_dir, event_log))
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+        last_event = event_log.append({"status": "error", "message": f"ジョブの実行に失敗しました: {e}"})
+    finally:
+        heartbeat.stop()
+        if heartbeat.lost:
+            # 停止とみなされ再投入・中断済みのため、状態は書き換えない
+            logger.warning(f"Job {job_id} was recovered after its heartbeat went stale")
+        else:
+            succeeded = last_event.get("status") == "complete" and bool(last_event.get("presentation_id"))
+            state.update({
+                "status": "succeeded" if succeeded else "failed",
+                "finished_at": time.time(),
+                "presentation_id": last_event.get("presentation_id"),
+                "url": last_event.get("url"),
+                "output_format": last_event.get("output_format")
+            })
+            _write_state(job_dir, state)
+
+
+async def _run_pipeline(job_dir: str, event_log: "_EventLog") -> Dict[str, Any]:
+    from app.core.dependencies import (
+        get_research_service,
+        get_ppt_composer_service,
+        get_presentation_store,
+        get_slide_renderer
+    )
+    from app.services.slide_workflow_service import SlideWorkflowService
+
+    with open(os.path.join(job_dir, "params.json"), encoding="utf-8") as f:
+        params = json.load(f)
+    with open(os.path.join(job_dir, "input.csv"), "rb") as f:
+        df = pd.read_csv(io.BytesIO(f.read()), encoding="utf-8-sig")
+
+    common = dict(
+        unit_no=params["unit_no"],
+        unit_title=params["unit_title"],
+        audience=params["audience"],
+        goals_list=params["goals_list"],
+        research_service=get_research_service(),
+        composer_service=get_ppt_composer_service(),
+        slide_service=get_slide_renderer(params.get("output_format", "google")),
+        draft=params.get("draft", False),
+        use_index=params.get("use_index", True)
+    )
+    if params.get("streaming"):
+        pipeline = SlideWorkflowService.run_streaming_pipeline(
+            df=df,
+            presentation_store=get_presentation_store(),
+            **common
+        )
+    else:
+        pipeline = SlideWorkflowService.run_generation_pipeline(
+            df=df,
+            presentation_id=params.get("presentation_id"),
+            presentation_store=get_presentation_store(),
+            **common
+        )
+    del df
+
+    last_event = {}
+    async for line in pipeline:
+        last_event = event_log.append(json.loads(line))
+    return last_event
+
+
+class _EventLog:
+    def __init__(self, job_dir: str):
+        self.path = os.path.join(job_dir, "events.ndjson")
+        with open(self.path, "rb") as f:
+            self.seq = sum(1 for line in f if line.strip())
+
+    def append(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        event = {"seq": self.seq, **event}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self.seq += 1
+        return event
+
+
+# 実行中はロックファイルの更新時刻をハートビートとして定期的に更新する
+class _Heartbeat(threading.Thread):
+    def __init__(self, lock_path: str):
+        super().__init__(daemon=True)
+        self.lock_path = lock_path
+        self.inode = os.stat(lock_path).st_ino
+        self._stopped = threading.Event()
+
+    @property
+    def lost(self) -> bool:
+        # ロックが退避・再取得されていれば、このワーカーの実行は引き継がれている
+        try:
+            return os.stat(self.lock_path).st_ino != self.inode
+        except FileNotFoundError:
+            return True
+
+    def run(self) -> None:
+        while not self._stopped.wait(settings.JOB_HEARTBEAT_SEC):
+            if self.lost:
+                return
+            try:
+                os.utime(self.lock_path)
+            except FileNotFoundError:
+                return
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+def _lock_path(job_dir: str) -> str:
+    return os.path.join(job_dir, "worker.lock")
+
+
+def _claim(job_dir: str) -> bool:
+    try:
+        fd = os.open(_lock_path(job_dir), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, "w") as f:
+        f.write(f"{socket.gethostname()}:{os.getpid()}:{os.getppid()}")
+    return True
+
+
+def _claimed_by_child(job_dir: str) -> bool:
+    # ロックを取得したのがこのプロセスが起動したプールのワーカーかどうか
+    try:
+        with open(_lock_path(job_dir), encoding="utf-8") as f:
+            host, _, ppid = f.read().rsplit(":", 2)
+    except (FileNotFoundError, ValueError):
+        return False
+    return host == socket.gethostname() and ppid == str(os.getpid())
+
+
+def _read_state(job_dir: str) -> Dict[str, Any]:
+    with open(os.path.join(job_dir, "state.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_state(job_dir: str, state: Dict[str, Any]) -> None:
+    tmp_path = os.path.join(job_dir, "state.json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, os.path.join(job_dir, "state.json"))
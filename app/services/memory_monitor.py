@@ -0,0 +1,68 @@
+import os
+import sys
+import threading
+from typing import Dict, Any
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+PROC_STATM = "/proc/self/statm"
+
+
+def current_rss_bytes() -> int:
+    if os.path.exists(PROC_STATM):
+        with open(PROC_STATM) as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    # /proc がない環境では最大RSSで代用する
+    return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    if resource is None:
+        return 0
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+# 実行中の RSS を定期的にサンプリングし、1回の実行におけるピークを記録する。
+# 同一プロセスで並行実行される他のパイプラインの使用量も含まれる概算値。
+class RSSMonitor:
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.baseline = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self) -> "RSSMonitor":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> "RSSMonitor":
+        self.baseline = current_rss_bytes()
+        self.peak = self.baseline
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.peak = max(self.peak, current_rss_bytes())
+
+    def report(self) -> Dict[str, Any]:
+        peak = max(self.peak, current_rss_bytes())
+        return {
+            "baseline_rss_mb": round(self.baseline / 1024 / 1024, 1),
+            "peak_rss_mb": round(peak / 1024 / 1024, 1),
+            "peak_delta_mb": round((peak - self.baseline) / 1024 / 1024, 1)
+        }
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss_bytes())
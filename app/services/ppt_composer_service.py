@@ -1,13 +1,17 @@
-import json
+import logging
 import re
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Any, Generator, Literal, Tuple
+from typing import List, Dict, Any, Generator, Literal, Tuple, Optional, Union, Annotated
 
 from openai import OpenAI, RateLimitError, APITimeoutError
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 
-GPT_MODEL = "gpt-4o"
+from app.core.config import settings
+from app.services.prompt_projection_service import PromptProjectionService
+from app.services.slide_repair_service import SlideRepairService, UnrecoverableLayoutError
+
+logger = logging.getLogger(__name__)
 
 class SlideLayoutItem(BaseModel):
     type: Literal["表紙", "本文", "要約"]
@@ -27,6 +31,45 @@ class SlideLayoutItem(BaseModel):
 class SlideLayoutResponse(BaseModel):
     slides: List[SlideLayoutItem]
 
+# 生成済みの final_composition を受け付けるためのスキーマ。表紙・本文・要約で形が異なる。
+class CoverSlideItem(BaseModel):
+    slide_id: str
+    type: Literal["表紙"]
+    title: str = "Cover"
+    layout_type: Literal["Cover"] = "Cover"
+    text_content: List[str] = Field(min_length=1, max_length=3)
+
+class BodySlideItem(SlideLayoutItem):
+    slide_id: str
+    type: Literal["本文"]
+    supplement: Optional[str] = None
+    model: Optional[str] = None
+
+class SummarySlideItem(SlideLayoutItem):
+    slide_id: str
+    type: Literal["要約"]
+    supplement: Optional[str] = None
+    model: Optional[str] = None
+
+ComposedSlideItem = Annotated[Union[CoverSlideItem, BodySlideItem, SummarySlideItem], Field(discriminator="type")]
+
+# LLM 呼び出し用のスキーマ。text_content の件数制約のみ外し、SlideRepairService で補正した後に SlideLayoutItem で検証する。
+class RawSlideLayoutItem(BaseModel):
+    type: Literal["表紙", "本文", "要約"]
+    title: str = Field(description="スライド タイトル(入力された slide_title そのまま使用)")
+    subtitle: str = Field(description="該当ページの核心内容を盛り込んであなたが作成した小見出し")
+    text_content: List[str] = Field(
+        description=(
+            "スライドの箇条書きに適した、簡潔でインパクトのある短い文章のリスト。"  
+            "冗長な説明は省き、核心のみを要約してください。"
+            "(必ず2〜4個の範囲)"
+        )
+    )
+    layout_type: Literal["A", "B", "C", "D", "E"] = Field(description="レイアウトタイプ")
+
+class RawSlideLayoutResponse(BaseModel):
+    slides: List[RawSlideLayoutItem]
+
 class PPTComposerService:
     SYSTEM_PROMPT = """あなたはeラーニング講座の「スライド構成およびデザインの専門家」です。
     提示されたデータをもとに、以下の「設計原則」と「レイアウトタイプ」に合わせて「スライド企画JSON」を作成してください。
@@ -54,24 +97,36 @@ class PPTComposerService:
     - E) [3分割型]: 並列的な3大原則や、3つの核心要素を説明するとき。
     * 必須条件: text_contentの項目数が「正確に3個」の場合にのみ選択可能です。2個や4個の場合は絶対に使用しないでください。"""
 
-    def __init__(self, api_key: str):
+    SUMMARY_PROMPT = "全体の学習内容を要約するスライドを1枚作成して。 layout_typeはCを使って"
+
+    def __init__(self, api_key: str, projector: PromptProjectionService = None):
         self.client = OpenAI(api_key=api_key.strip())
+        self.repairer = SlideRepairService()
+        self.projector = projector or PromptProjectionService()
 
-    def run_composition(self, research_data: List[Dict[str, Any]], max_workers: int = 5) -> Generator[Dict[str, Any], None, None]:
+    def run_composition(
+        self,
+        research_data: List[Dict[str, Any]],
+        max_workers: int = None,
+        draft: bool = False
+    ) -> Generator[Dict[str, Any], None, None]:
         if not research_data:
             return
 
+        design_model = settings.DRAFT_MODEL if draft else settings.DESIGN_MODEL
+        summary_model = settings.DRAFT_MODEL if draft else settings.SUMMARY_MODEL
+
         first_item = research_data[0]
-        cover = self._create_cover_slide(first_item)
+        cover = self.create_cover_slide(first_item)
         all_slides = [cover]
         yield {"status": "progress", "message": "表紙デザイン完了", "data": cover}
 
         total = len(research_data)
         results = [None] * total
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        with ThreadPoolExecutor(max_workers=max_workers or settings.LLM_MAX_WORKERS) as executor:
             future_to_idx = {
-                executor.submit(self._get_design_response, item): idx 
+                executor.submit(self.get_design_response, item, design_model): idx
                 for idx, item in enumerate(research_data)
             }
 
@@ -83,23 +138,14 @@ class PPTComposerService:
                 
                 try:
                     res_data = future.result()
-                    slides = []
-                    
-                    for page_num, s in enumerate(res_data.get("slides", []), start=1):
-                        slide_item = {
-                            "slide_id": f"{topic_id}-{page_num}", 
-                            **s, 
-                            "type": "本文"
-                        }
-                        slides.append(slide_item)
-                    
-                    results[idx] = slides
+                    results[idx] = self.build_topic_slides(topic_id, res_data, draft)
                     completed_count += 1
                     
                     yield {
                         "status": "progress", 
-                        "message": f"🎨 [{completed_count}/{total}] '{item.get('slide_title', 'タイトルなし')}' 設計完了",
-                        "percent": int((completed_count / total) * 100)
+                        "message": f"🎨 [{completed_count}/{total}] '{item.get('slide_title', 'タイトルなし')}' 設計完了 ({design_model})",
+                        "percent": int((completed_count / total) * 100),
+                        "model": design_model
                     }
 
                 except Exception as e:
@@ -113,9 +159,9 @@ class PPTComposerService:
 
         try:
             last_topic_id = research_data[-1].get('slide_number', total)
-            summary = self._get_summary_response(last_topic_id)
+            summary = self.get_summary_response(last_topic_id, summary_model, draft=draft)
             all_slides.append(summary)
-            yield {"status": "progress", "message": "📝最終要約スライド 完了", "data": summary}
+            yield {"status": "progress", "message": f"📝最終要約スライド 完了 ({summary_model})", "data": summary, "model": summary_model}
         except Exception as e:
              yield {"status": "error", "message": f"要約スライドの作成に失敗: {str(e)}"}
 
@@ -123,10 +169,19 @@ class PPTComposerService:
         yield {
             "status": "complete",
             "message": "✨すべてのデザイン工程が完了！",
-            "data": all_slides
+            "data": all_slides,
+            "models": {s["slide_id"]: s.get("model") for s in all_slides if s.get("model")},
+            "repair_stats": self.repairer.summary(),
+            "prompt_stats": self.projector.summary()
         }
 
-    def _create_cover_slide(self, first_item: Dict[str, Any]) -> Dict[str, Any]:
+    def build_topic_slides(self, topic_id: Any, res_data: Dict[str, Any], draft: bool = False) -> List[Dict[str, Any]]:
+        return [
+            {"slide_id": f"{topic_id}-{page_num}", **s, "type": "本文", "model": res_data.get("model"), "draft": draft}
+            for page_num, s in enumerate(res_data.get("slides", []), start=1)
+        ]
+
+    def create_cover_slide(self, first_item: Dict[str, Any]) -> Dict[str, Any]:
         raw_unit_title = first_item.get('unit_title', '')
         main_title, sub_title = self._extract_subtitle(raw_unit_title)
         return {
@@ -146,20 +201,26 @@ class PPTComposerService:
             return match.group(1).strip(), match.group(2).strip()
         return text.strip(), ""
 
-    def _get_design_response(self, item: Dict) -> Dict[str, Any]:
+    def get_design_response(self, item: Dict, model: str = None, hints: str = None) -> Dict[str, Any]:
+        model = model or settings.DESIGN_MODEL
         max_retries = 3
+        last_error = None
+        # 固定の指示を先頭に置き、SYSTEM_PROMPT からのプレフィックスキャッシュを効かせる
+        user_content = f"スライドを2枚構成して。データ: {self.projector.render(item)}"
+        if hints:
+            user_content += f"\n編集者からの指示: {hints}"
         for attempt in range(max_retries):
             try:
                 completion = self.client.beta.chat.completions.parse(
-                    model=GPT_MODEL,
+                    model=model,
                     messages=[
                         {"role": "system", "content": self.SYSTEM_PROMPT},
-                        {"role": "user", "content": f"データ: {json.dumps(item, ensure_ascii=False)}. スライドを2枚構成して"}
+                        {"role": "user", "content": user_content}
                     ],
-                    response_format=SlideLayoutResponse,
+                    response_format=RawSlideLayoutResponse,
                 )
                 parsed = completion.choices[0].message.parsed
-                return parsed.model_dump() if parsed else {"slides": []}
+                raw = parsed.model_dump() if parsed else {"slides": []}
             
             except (RateLimitError, APITimeoutError) as e:
                 if attempt < max_retries - 1:
@@ -171,23 +232,45 @@ class PPTComposerService:
             except Exception as e:
                 raise RuntimeError(f"API 呼び出し失敗: {e}")
 
-    def _get_summary_response(self, last_id: int) -> Dict[str, Any]:
+            try:
+                return {**self._repair_layout(raw, item.get('slide_title'), pages=2), "model": model}
+            except UnrecoverableLayoutError as e:
+                last_error = e
+                if attempt < max_retries - 1:
+                    self.repairer.record("recalled")
+
+        self.repairer.record("failed")
+        raise RuntimeError(f"レイアウト補正不可: {last_error}")
+
+    def _repair_layout(self, raw: Dict[str, Any], slide_title: str = None, pages: int = 2) -> Dict[str, Any]:
+        repaired, fixes = self.repairer.repair_response(raw, slide_title, pages=pages)
+        try:
+            slides = [SlideLayoutItem(**s).model_dump() for s in repaired["slides"]]
+        except ValidationError as e:
+            raise UnrecoverableLayoutError(str(e))
+
+        self.repairer.record("repaired" if fixes else "clean")
+        if fixes:
+            logger.info(f"Layout repaired ({slide_title}): {', '.join(fixes)}")
+        return {"slides": slides}
+
+    def get_summary_response(self, last_id: int, model: str = None, hints: str = None, draft: bool = False) -> Dict[str, Any]:
+        model = model or settings.SUMMARY_MODEL
+        user_content = f"{self.SUMMARY_PROMPT}\n編集者からの指示: {hints}" if hints else self.SUMMARY_PROMPT
         max_retries = 3
+        last_error = None
         for attempt in range(max_retries):
             try:
                 completion = self.client.beta.chat.completions.parse(
-                    model=GPT_MODEL,
+                    model=model,
                     messages=[
                         {"role": "system", "content": self.SYSTEM_PROMPT},
-                        {"role": "user", "content": "全体の学習内容を要約するスライドを1枚作成して。 layout_typeはCを使って"}
+                        {"role": "user", "content": user_content}
                     ],
-                    response_format=SlideLayoutResponse,
+                    response_format=RawSlideLayoutResponse,
                 )
                 parsed = completion.choices[0].message.parsed
-                if parsed and parsed.slides:
-                     s = parsed.slides[0].model_dump()
-                     return {"slide_id": f"{last_id + 1}-1", **s, "type": "要約"}
-                raise ValueError("要約スライド 作成 結果なし")
+                raw = parsed.model_dump() if parsed else {"slides": []}
 
             except (RateLimitError, APITimeoutError) as e:
                 if attempt < max_retries - 1:
@@ -195,4 +278,15 @@ class PPTComposerService:
                     time.sleep(wait_time)
                     continue
                 else:
-                    raise e
\ No newline at end of file
+                    raise e
+
+            try:
+                s = self._repair_layout(raw, pages=1)["slides"][0]
+                return {"slide_id": f"{last_id + 1}-1", **s, "type": "要約", "model": model, "draft": draft}
+            except UnrecoverableLayoutError as e:
+                last_error = e
+                if attempt < max_retries - 1:
+                    self.repairer.record("recalled")
+
+        self.repairer.record("failed")
+        raise ValueError(f"要約スライド 作成 結果なし: {last_error}")
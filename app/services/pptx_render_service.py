@@ -0,0 +1,153 @@
+import os
+import uuid
+from typing import Dict, Any
+
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.enum.text import MSO_ANCHOR, PP_ALIGN
+from pptx.oxml.ns import qn
+from pptx.util import Pt
+
+from app.core.config import settings
+from app.services.slide_request_builder import SlideRequestBuilder
+
+SLIDE_WIDTH_PT = 720
+SLIDE_HEIGHT_PT = 405
+BLANK_LAYOUT_INDEX = 6
+
+SHAPE_TYPES = {
+    'RECTANGLE': MSO_SHAPE.RECTANGLE,
+    'ROUND_RECTANGLE': MSO_SHAPE.ROUNDED_RECTANGLE,
+}
+
+ALIGNMENTS = {
+    'START': PP_ALIGN.LEFT,
+    'CENTER': PP_ALIGN.CENTER,
+    'END': PP_ALIGN.RIGHT,
+    'JUSTIFIED': PP_ALIGN.JUSTIFY,
+}
+
+
+# Google Slides API と同じリクエスト列を生成し、python-pptx の図形に再生する。
+# レイアウト座標は SlideRequestBuilder の実装を共有する。
+class PptxRenderService(SlideRequestBuilder):
+    OUTPUT_FORMAT = "pptx"
+    COMPLETE_MESSAGE = "PPTXファイルの作成が完了!"
+    DOWNLOAD_PATH = "/api/v1/research/download"
+
+    def __init__(self, output_dir: str = None):
+        self.output_dir = output_dir or settings.PPTX_OUTPUT_DIR
+
+    def create_presentation_from_json(self, slide_data: list):
+        if not slide_data or not isinstance(slide_data, list):
+            return None, "有効なスライドデータがありません。"
+
+        handle = self.begin_presentation(self.presentation_title(slide_data))
+        self.append_slides(handle, slide_data)
+        return self.finish_presentation(handle)
+
+    def begin_presentation(self, title: str) -> Dict[str, Any]:
+        prs = Presentation()
+        prs.slide_width = Pt(SLIDE_WIDTH_PT)
+        prs.slide_height = Pt(SLIDE_HEIGHT_PT)
+        prs.core_properties.title = title
+        return {"file_id": uuid.uuid4().hex, "prs": prs}
+
+    def append_slides(self, handle: Dict[str, Any], slides: list) -> None:
+        # オブジェクトIDの対応表はスライド単位で破棄する
+        for item in slides:
+            pages = {}
+            shapes = {}
+            for req in self.generate_slide_requests(item):
+                self._apply_request(handle["prs"], req, pages, shapes)
+
+    def finish_presentation(self, handle: Dict[str, Any]):
+        file_id = handle["file_id"]
+        path = self.get_file_path(file_id)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        handle["prs"].save(path)
+        return file_id, f"{self.DOWNLOAD_PATH}/{file_id}"
+
+    def get_file_path(self, file_id: str) -> str:
+        return os.path.join(self.output_dir, f"{file_id}.pptx")
+
+    def _apply_request(self, prs, req: Dict[str, Any], pages: Dict, shapes: Dict) -> None:
+        kind, body = next(iter(req.items()))
+
+        if kind == 'createSlide':
+            pages[body['objectId']] = prs.slides.add_slide(prs.slide_layouts[BLANK_LAYOUT_INDEX])
+        elif kind == 'updatePageProperties':
+            color = body['pageProperties']['pageBackgroundFill']['solidFill']['color']['rgbColor']
+            fill = pages[body['objectId']].background.fill
+            fill.solid()
+            fill.fore_color.rgb = self._rgb(color)
+        elif kind == 'createShape':
+            shapes[body['objectId']] = self._add_shape(pages, body)
+        elif kind == 'insertText':
+            shapes[body['objectId']].text_frame.text = body['text']
+        elif kind == 'updateTextStyle':
+            self._apply_text_style(shapes[body['objectId']], body['style'])
+        elif kind == 'updateShapeProperties':
+            self._apply_shape_properties(shapes[body['objectId']], body['shapeProperties'])
+        elif kind == 'updateParagraphStyle':
+            self._apply_paragraph_style(shapes[body['objectId']], body['style'])
+
+    def _add_shape(self, pages: Dict, body: Dict[str, Any]):
+        props = body['elementProperties']
+        slide = pages[props['pageObjectId']]
+        x = Pt(props['transform']['translateX'])
+        y = Pt(props['transform']['translateY'])
+        w = Pt(props['size']['width']['magnitude'])
+        h = Pt(props['size']['height']['magnitude'])
+
+        if body['shapeType'] == 'TEXT_BOX':
+            shape = slide.shapes.add_textbox(x, y, w, h)
+            shape.text_frame.word_wrap = True
+            return shape
+
+        shape = slide.shapes.add_shape(SHAPE_TYPES.get(body['shapeType'], MSO_SHAPE.RECTANGLE), x, y, w, h)
+        shape.shadow.inherit = False
+        return shape
+
+    def _apply_text_style(self, shape, style: Dict[str, Any]) -> None:
+        color = style.get('foregroundColor', {}).get('opaqueColor', {}).get('rgbColor')
+        for paragraph in shape.text_frame.paragraphs:
+            for run in paragraph.runs:
+                font = run.font
+                font.size = Pt(style['fontSize']['magnitude'])
+                font.bold = style.get('bold', False)
+                font.italic = style.get('italic', False)
+                if style.get('fontFamily'):
+                    font.name = style['fontFamily']
+                    self._set_east_asian_font(run, style['fontFamily'])
+                if color:
+                    font.color.rgb = self._rgb(color)
+
+    def _apply_shape_properties(self, shape, props: Dict[str, Any]) -> None:
+        fill = props.get('shapeBackgroundFill')
+        if fill:
+            shape.fill.solid()
+            shape.fill.fore_color.rgb = self._rgb(fill['solidFill']['color']['rgbColor'])
+        if props.get('outline', {}).get('propertyState') == 'NOT_RENDERED':
+            shape.line.fill.background()
+        if props.get('contentAlignment') == 'MIDDLE':
+            shape.text_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
+
+    def _apply_paragraph_style(self, shape, style: Dict[str, Any]) -> None:
+        for paragraph in shape.text_frame.paragraphs:
+            if 'lineSpacing' in style:
+                paragraph.line_spacing = style['lineSpacing'] / 100
+            if style.get('alignment') in ALIGNMENTS:
+                paragraph.alignment = ALIGNMENTS[style['alignment']]
+
+    def _set_east_asian_font(self, run, typeface: str) -> None:
+        rPr = run._r.get_or_add_rPr()
+        ea = rPr.find(qn('a:ea'))
+        if ea is None:
+            ea = rPr.makeelement(qn('a:ea'), {})
+            rPr.append(ea)
+        ea.set('typeface', typeface)
+
+    def _rgb(self, color: Dict[str, float]) -> RGBColor:
+        return RGBColor(*(round(color.get(k, 0.0) * 255) for k in ('red', 'green', 'blue')))
@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+import uuid
+from typing import Dict, Any, Optional, List
+
+from app.core.config import settings
+
+
+# プレゼンテーションごとの構成・Research 結果を {store_dir}/{id}.json に保存する。
+# 大規模ユニットではトピック単位で {id}.jsonl に追記し、読み込み時に連結する。
+class PresentationStore:
+    _lock = threading.Lock()
+    LIST_FIELDS = ("composition", "topics")
+
+    def __init__(self, store_dir: str = None):
+        self.store_dir = store_dir or settings.PRESENTATION_STORE_DIR
+
+    def load(self, presentation_id: str) -> Optional[Dict[str, Any]]:
+        path = self._path(presentation_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            record = json.load(f)
+
+        parts_path = self._parts_path(presentation_id)
+        if os.path.exists(parts_path):
+            for field in self.LIST_FIELDS:
+                record.setdefault(field, [])
+            for part in self._read_parts(parts_path):
+                for field in self.LIST_FIELDS:
+                    record[field].extend(part.get(field, []))
+        return record
+
+    def save(self, presentation_id: str, **fields: Any) -> Dict[str, Any]:
+        with self._lock:
+            # 追記分はここで 1 ファイルにまとめる
+            record = self.load(presentation_id) or {"presentation_id": presentation_id}
+            record.update(fields)
+            self._write(presentation_id, record)
+            self._remove(self._parts_path(presentation_id))
+            return record
+
+    # ストリーミング生成用。プレゼンテーション ID が決まる前から構成を追記し、
+    # finish() で ID に紐付ける。途中で失敗した場合は discard() で破棄する。
+    def begin(self) -> str:
+        os.makedirs(self.store_dir, exist_ok=True)
+        draft_id = uuid.uuid4().hex
+        open(self._pending_path(draft_id), 'a', encoding='utf-8').close()
+        return draft_id
+
+    def append(self, draft_id: str, **parts: List[Any]) -> None:
+        with open(self._pending_path(draft_id), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(parts, ensure_ascii=False) + "\n")
+
+    def finish(self, draft_id: str, presentation_id: str, **fields: Any) -> None:
+        with self._lock:
+            record = {"presentation_id": presentation_id, **fields}
+            for field in self.LIST_FIELDS:
+                record.pop(field, None)
+            os.replace(self._pending_path(draft_id), self._parts_path(presentation_id))
+            self._write(presentation_id, record)
+
+    def discard(self, draft_id: str) -> None:
+        self._remove(self._pending_path(draft_id))
+
+    def _write(self, presentation_id: str, record: Dict[str, Any]) -> None:
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = self._path(presentation_id) + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path(presentation_id))
+
+    @staticmethod
+    def _read_parts(path: str):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _path(self, presentation_id: str) -> str:
+        return os.path.join(self.store_dir, f"{self._safe_id(presentation_id)}.json")
+
+    def _parts_path(self, presentation_id: str) -> str:
+        return os.path.join(self.store_dir, f"{self._safe_id(presentation_id)}.jsonl")
+
+    def _pending_path(self, draft_id: str) -> str:
+        return os.path.join(self.store_dir, f"{self._safe_id(draft_id)}.pending.jsonl")
+
+    @staticmethod
+    def _safe_id(presentation_id: str) -> str:
+        return "".join(c for c in presentation_id if c.isalnum() or c in "-_")
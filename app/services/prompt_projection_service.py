@@ -0,0 +1,74 @@
+import json
+import math
+import threading
+from typing import List, Dict, Any, Optional
+
+from app.core.config import settings
+
+CJK_TOKENS_PER_CHAR = 0.9
+ASCII_CHARS_PER_TOKEN = 4.0
+TRUNCATION_MARK = "…"
+
+
+def estimate_tokens(text: str) -> int:
+    # トークナイザを使わない概算。日本語は1文字≒1トークン、英数字は4文字≒1トークン。
+    if not text:
+        return 0
+    cjk = sum(1 for ch in text if ord(ch) >= 0x3000)
+    other = len(text) - cjk
+    return int(math.ceil(cjk * CJK_TOKENS_PER_CHAR + other / ASCII_CHARS_PER_TOKEN))
+
+
+# Research 結果からデザイン工程で使うフィールドのみを抽出・圧縮してプロンプトに載せる。
+class PromptProjectionService:
+    def __init__(self, fields: Optional[List[str]] = None, max_chars: Optional[int] = None):
+        self.fields = fields if fields is not None else settings.DESIGN_PROMPT_FIELDS
+        self.max_chars = max_chars if max_chars is not None else settings.DESIGN_PROMPT_MAX_CHARS
+
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "original_tokens": 0, "projected_tokens": 0}
+
+    def project(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        projected = {}
+        for field in self.fields:
+            value = self._compact_value(item.get(field))
+            if value is not None:
+                projected[field] = value
+        return projected
+
+    def render(self, item: Dict[str, Any]) -> str:
+        payload = json.dumps(self.project(item), ensure_ascii=False, separators=(",", ":"))
+
+        original = json.dumps(item, ensure_ascii=False, default=str)
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["original_tokens"] += estimate_tokens(original)
+            self.stats["projected_tokens"] += estimate_tokens(payload)
+        return payload
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["tokens_saved"] = stats["original_tokens"] - stats["projected_tokens"]
+        return stats
+
+    def _compact_value(self, value: Any) -> Any:
+        if isinstance(value, (list, tuple)):
+            items = [self._compact_value(v) for v in value]
+            items = [v for v in items if v is not None]
+            return items or None
+        if value is None:
+            return None
+        if isinstance(value, float):
+            if math.isnan(value):
+                return None
+            return int(value) if value.is_integer() else value
+        if isinstance(value, (int, bool)):
+            return value
+
+        text = " ".join(str(value).split())
+        if not text or text.lower() == "nan":
+            return None
+        if self.max_chars and len(text) > self.max_chars:
+            text = text[:self.max_chars] + TRUNCATION_MARK
+        return text
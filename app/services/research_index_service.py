@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.core.config import settings
+
+MERSENNE_PRIME = (1 << 61) - 1
+NORMALIZE_PATTERN = re.compile(r"[\s\W_]+", re.UNICODE)
+
+
+def normalize_title(text: str) -> str:
+    text = unicodedata.normalize("NFKC", str(text or "")).lower()
+    return NORMALIZE_PATTERN.sub("", text)
+
+
+# 過去の Research 結果をタイトルの文字 n-gram で索引し、近似一致を探す。
+# 候補抽出は MinHash + LSH、採否は n-gram 集合の Jaccard 係数で判定する。
+class ResearchIndexService:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ngram: Optional[int] = None,
+        num_perm: int = 64,
+        bands: int = 32
+    ):
+        self.path = path or settings.RESEARCH_INDEX_PATH
+        self.stats_path = f"{os.path.splitext(self.path)[0]}.stats.jsonl"
+        self.ngram = ngram or settings.RESEARCH_INDEX_NGRAM
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = random.Random(20240601)
+        self._perms = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME)) for _ in range(num_perm)]
+
+        self._lock = threading.Lock()
+        self._entries: List[Dict[str, Any]] = []
+        self._exact: Dict[Tuple[str, str], int] = {}
+        self._buckets: Dict[Tuple, List[int]] = defaultdict(list)
+        self._offset = 0
+        self._stats_offset = 0
+
+        self.stats = {"exact": 0, "reuse": 0, "adapt": 0, "miss": 0}
+        self.score_histogram = [0] * 10
+
+    def lookup(self, title: str, context: str) -> Tuple[float, Optional[Dict[str, Any]]]:
+        norm = normalize_title(title)
+        if not norm:
+            return 0.0, None
+
+        with self._lock:
+            self._sync()
+
+            idx = self._exact.get((context, norm))
+            if idx is not None:
+                return 1.0, self._entries[idx]
+
+            shingles = self._shingles(norm)
+            candidates = set()
+            for band_key in self._band_keys(self._signature(shingles)):
+                candidates.update(self._buckets.get((context, *band_key), []))
+
+            best_score, best_entry = 0.0, None
+            for idx in candidates:
+                entry = self._entries[idx]
+                score = self._jaccard(shingles, self._shingles(entry["norm"]))
+                if score > best_score:
+                    best_score, best_entry = score, entry
+            return best_score, best_entry
+
+    def add(self, title: str, context: str, result: Dict[str, Any], model: Optional[str] = None) -> None:
+        norm = normalize_title(title)
+        if not norm or not result:
+            return
+
+        entry = {"context": context, "title": title, "norm": norm, "result": result, "model": model}
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+
+        with self._lock:
+            self._sync()
+            if (context, norm) in self._exact:
+                return
+
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self._sync()
+
+    def record(self, outcome: str, score: float) -> None:
+        # 再起動後や複数ワーカー間でも集計できるよう、索引の隣の統計ファイルに追記する
+        line = json.dumps({"outcome": outcome, "score": round(score, 3)}) + "\n"
+        with self._lock:
+            os.makedirs(os.path.dirname(self.stats_path) or ".", exist_ok=True)
+            with open(self.stats_path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            self._sync()
+            self._sync_stats()
+            stats = dict(self.stats)
+            histogram = list(self.score_histogram)
+            size = len(self._entries)
+
+        total = sum(stats.values())
+        hits = stats["exact"] + stats["reuse"] + stats["adapt"]
+        return {
+            **stats,
+            "entries": size,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+            "score_histogram": {f"{i / 10:.1f}-{(i + 1) / 10:.1f}": n for i, n in enumerate(histogram)}
+        }
+
+    def _sync(self) -> None:
+        # 他プロセスが追記した分も取り込む
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+
+        complete_part = chunk[:chunk.rfind(b"\n") + 1]
+        self._offset += len(complete_part)
+
+        for line in complete_part.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            self._insert(entry)
+
+    def _sync_stats(self) -> None:
+        if not os.path.exists(self.stats_path):
+            return
+        with open(self.stats_path, "rb") as f:
+            f.seek(self._stats_offset)
+            chunk = f.read()
+
+        complete_part = chunk[:chunk.rfind(b"\n") + 1]
+        self._stats_offset += len(complete_part)
+
+        for line in complete_part.decode("utf-8").splitlines():
+            try:
+                record = json.loads(line)
+                outcome, score = record["outcome"], float(record["score"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            if outcome in self.stats:
+                self.stats[outcome] += 1
+                self.score_histogram[min(9, int(score * 10))] += 1
+
+    def _insert(self, entry: Dict[str, Any]) -> None:
+        key = (entry["context"], entry["norm"])
+        if key in self._exact:
+            return
+
+        idx = len(self._entries)
+        self._entries.append(entry)
+        self._exact[key] = idx
+        for band_key in self._band_keys(self._signature(self._shingles(entry["norm"]))):
+            self._buckets[(entry["context"], *band_key)].append(idx)
+
+    def _shingles(self, norm: str) -> set:
+        if len(norm) <= self.ngram:
+            return {norm}
+        return {norm[i:i + self.ngram] for i in range(len(norm) - self.ngram + 1)}
+
+    def _signature(self, shingles: set) -> List[int]:
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") for s in shingles]
+        return [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in self._perms]
+
+    def _band_keys(self, signature: List[int]) -> List[Tuple[int, ...]]:
+        return [(band, *signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    @staticmethod
+    def _jaccard(a: set, b: set) -> float:
+        if not a or not b:
+            return 0.0
+        return len(a & b) / len(a | b)
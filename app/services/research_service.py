@@ -1,13 +1,17 @@
+import hashlib
+import json
+import threading
 import pandas as pd
 import time
 from openai import OpenAI, RateLimitError, APITimeoutError
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Generator
+from typing import List, Dict, Any, Generator, Optional, Tuple, Callable, Type
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from app.core.config import settings
+from app.services.research_index_service import ResearchIndexService
+
 
-GPT_MODEL = "gpt-4o"
-    
 class SlideResponse(BaseModel):
     conclusion: str = Field(description="核心要約1文")
     key_messages: List[str] = Field(description="最大3点。短く簡潔に")
@@ -18,6 +22,23 @@ class SlideResponse(BaseModel):
     split_plan: str = Field(description="1/2 ページ(Why/What)、2/2 ページ(How/Specific) 要素区分")
     references: str = Field(description="[タイトル / 著者·機関 / 年 / 要約]")
 
+# 受講者に依存しない共通部分。slide_title 単位で索引に保存し、受講者が変わっても再利用する。
+class CoreResearchResponse(BaseModel):
+    conclusion: str = Field(description="核心要約1文")
+    key_messages: List[str] = Field(description="最大3点。短く簡潔に")
+    case_study: str = Field(description="【状況→行動→結果】 構造の具体的な業務シーン")
+    split_plan: str = Field(description="1/2 ページ(Why/What)、2/2 ページ(How/Specific) 要素区分")
+    references: str = Field(description="[タイトル / 著者·機関 / 年 / 要約]")
+
+# 受講者・学習目標に合わせる部分。軽量モデルで毎回作成する。
+class TailoredResearchResponse(BaseModel):
+    conclusion: str = Field(description="受講者に合わせた語り口の核心要約1文")
+    pitfalls: List[str] = Field(description="受講者がよくするミス1~2点")
+    action_item: str = Field(description="講義直後にすぐ実行する「Next Step」の1文")
+    mini_work: str = Field(description="30秒以内に考えられる質問")
+
+CORE_CONTEXT = "core"
+
 class ResearchService:
     SYSTEM_INSTRUCTION = """あなたは企業向けeラーニング講座の専門原稿設計者です。 
     下記の「作成原則」を遵守し、挨拶のない本論【No】からスタートのみ出力してください。
@@ -27,8 +48,13 @@ class ResearchService:
     2. 【内容】ビジネスとは無関係な抽象的比喩（宇宙、料理など）の禁止。 実際の業務現場密着型で作成。
     3. 【根拠】出典不明の通念は"根拠弱"明示。 公共機関/報告書のデータを優先的に活用。"""
 
-    def __init__(self, api_key: str):
+    SOURCE_LABELS = {"exact": "過去結果を再利用", "reuse": "類似結果を再利用", "adapt": "類似結果を調整", "draft": "下書き"}
+
+    def __init__(self, api_key: str, index: Optional[ResearchIndexService] = None):
         self.client = OpenAI(api_key=api_key.strip())
+        self.index = index
+        self._stats_lock = threading.Lock()
+        self.reuse_stats = {"exact": 0, "reuse": 0, "adapt": 0, "miss": 0}
 
     def run_research(
         self,
@@ -37,10 +63,12 @@ class ResearchService:
         unit_title: str,
         audience: str,
         learning_goals: List[str],
-        max_workers: int = 5
+        max_workers: int = None,
+        draft: bool = False,
+        use_index: bool = True
     ) -> Generator[Dict[str, Any], None, None]:
         
-        filtered_df = self._filter_dataframe(df, unit_number, unit_title)
+        filtered_df = self.filter_dataframe(df, unit_number, unit_title)
 
         if filtered_df.empty:
             yield {"status": "error", "message": "一致するユニットが見つかりません。"}
@@ -48,12 +76,23 @@ class ResearchService:
 
         source_data = filtered_df.to_dict(orient="records")
         total_count = len(source_data)
+
+        if draft and settings.DRAFT_SKIP_RESEARCH:
+            # 下書きモードでは slide_title をそのまま設計工程に渡す
+            yield {
+                "status": "complete",
+                "message": "下書きモードのため Research を省略しました。",
+                "percent": 100,
+                "data": [{**item, "research_model": None, "draft": True} for item in source_data],
+                "reuse_stats": self.reuse_summary()
+            }
+            return
         
         results = [None] * total_count
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        with ThreadPoolExecutor(max_workers=max_workers or settings.LLM_MAX_WORKERS) as executor:
             future_to_index = {
-                executor.submit(self._fetch_ai_response, item['slide_title'], audience, learning_goals): idx
+                executor.submit(self.get_research, item['slide_title'], audience, learning_goals, draft, use_index): idx
                 for idx, item in enumerate(source_data)
             }
 
@@ -67,13 +106,16 @@ class ResearchService:
                 original_item = source_data[idx]
 
                 try:
-                    ai_response = future.result()
+                    ai_response, source = future.result()
+                    model = ai_response["research_model"]
                     results[idx] = {**original_item, **ai_response}
+                    label = f" ({self.SOURCE_LABELS[source]})" if source in self.SOURCE_LABELS else ""
                     
                     yield {
                         "status": "progress",
-                        "message": f"[{completed_count}/{total_count}] {original_item.get('slide_title', 'タイトルなし')}",
-                        "percent": percent
+                        "message": f"[{completed_count}/{total_count}] {original_item.get('slide_title', 'タイトルなし')}{label}",
+                        "percent": percent,
+                        "model": model
                     }
                 except Exception as e:
                     results[idx] = original_item 
@@ -88,10 +130,12 @@ class ResearchService:
             "status": "complete",
             "message": "すべての分析が完了！",
             "percent": 100,
-            "data": final_results
+            "data": final_results,
+            "reuse_stats": self.reuse_summary()
         }
 
-    def _filter_dataframe(self, df: pd.DataFrame, unit_number: int, unit_title: str) -> pd.DataFrame:
+    @staticmethod
+    def filter_dataframe(df: pd.DataFrame, unit_number: int, unit_title: str) -> pd.DataFrame:
         target_title_norm = str(unit_title).replace(" ", "").replace("　", "").strip()
         
         numeric_col = pd.to_numeric(df['unit_number'], errors='coerce').fillna(0).astype(int)
@@ -102,17 +146,174 @@ class ResearchService:
 
         return df[mask_number & mask_title].copy()
 
-    def _fetch_ai_response(self, slide_title: str, audience: str, goals: List[str]) -> Dict[str, Any]:
+    def reuse_summary(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.reuse_stats)
+        total = sum(stats.values())
+        hits = total - stats["miss"]
+        return {**stats, "hit_rate": round(hits / total, 3) if total else 0.0}
+
+    def get_research(
+        self,
+        slide_title: str,
+        audience: str,
+        goals: List[str],
+        draft: bool = False,
+        use_index: bool = True,
+        hints: str = None
+    ) -> Tuple[Dict[str, Any], str]:
+        # 結果には作成したモデル(research_model)と下書きかどうか(draft)を含める。
+        # 下書きの結果は品質が低いため索引には登録しない
+        if draft:
+            result = self._fetch_ai_response(slide_title, audience, goals, model=settings.DRAFT_MODEL, hints=hints)
+            return {**result, "research_model": settings.DRAFT_MODEL, "draft": True}, "draft"
+
+        # 共通部分は索引で再利用するために分けて取得する。索引を使わない場合は 1 回の呼び出しで済ませる
+        if settings.RESEARCH_TWO_TIER and self.index is not None and use_index:
+            core, source, core_model = self._lookup_or_fetch(
+                slide_title,
+                CORE_CONTEXT,
+                fetch=lambda: self._fetch_core_response(slide_title, hints),
+                adapt=lambda entry: self._adapt_core_response(entry, slide_title),
+                use_index=use_index
+            )
+            tailored = self._fetch_tailored_response(core, slide_title, audience, goals, hints)
+            return {
+                **core,
+                **tailored,
+                "research_model": settings.RESEARCH_TAILOR_MODEL,
+                "core_model": core_model,
+                "draft": False
+            }, source
+
+        result, source, model = self._lookup_or_fetch(
+            slide_title,
+            self.context_key(audience, goals),
+            fetch=lambda: self._fetch_ai_response(slide_title, audience, goals, hints=hints),
+            adapt=lambda entry: self._adapt_ai_response(entry, slide_title, audience, goals),
+            use_index=use_index
+        )
+        return {**result, "research_model": model, "draft": False}, source
+
+    def _lookup_or_fetch(
+        self,
+        slide_title: str,
+        context: str,
+        fetch: Callable[[], Dict[str, Any]],
+        adapt: Callable[[Dict[str, Any]], Dict[str, Any]],
+        use_index: bool = True
+    ) -> Tuple[Dict[str, Any], str, str]:
+        # use_index=False の場合は索引を参照・登録せずに取得し直す
+        if self.index is None or not use_index:
+            return fetch(), "miss", settings.RESEARCH_MODEL
+
+        score, entry = self.index.lookup(slide_title, context)
+
+        if entry is not None and score >= 1.0:
+            source, result, model = "exact", entry["result"], entry.get("model") or settings.RESEARCH_MODEL
+        elif entry is not None and score >= settings.RESEARCH_REUSE_THRESHOLD:
+            source, result, model = "reuse", entry["result"], entry.get("model") or settings.RESEARCH_MODEL
+        elif entry is not None and score >= settings.RESEARCH_ADAPT_THRESHOLD:
+            source, result, model = "adapt", adapt(entry), settings.RESEARCH_ADAPT_MODEL
+        else:
+            source, result, model = "miss", fetch(), settings.RESEARCH_MODEL
+
+        if source in ("adapt", "miss"):
+            self.index.add(slide_title, context, result, model)
+
+        self.index.record(source, score)
+        with self._stats_lock:
+            self.reuse_stats[source] += 1
+        return result, source, model
+
+    @staticmethod
+    def context_key(audience: str, goals: List[str]) -> str:
+        raw = f"{str(audience).strip()}|{','.join(g.strip() for g in goals)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    def _fetch_ai_response(
+        self,
+        slide_title: str,
+        audience: str,
+        goals: List[str],
+        model: str = None,
+        hints: str = None
+    ) -> Dict[str, Any]:
+        user_content = f"Title: {slide_title}\nAudience: {audience}\nGoals: {', '.join(goals)}"
+        if hints:
+            user_content += f"\nNotes: {hints}"
+        return self._parse_with_retry(model or settings.RESEARCH_MODEL, [
+            {"role": "system", "content": self.SYSTEM_INSTRUCTION},
+            {"role": "user", "content": user_content}
+        ])
+
+    def _fetch_core_response(self, slide_title: str, hints: str = None) -> Dict[str, Any]:
+        user_content = (
+            f"Title: {slide_title}\n"
+            "受講者や学習目標に依存しない共通の内容（事実・根拠・事例・参考文献）のみを作成してください。"
+        )
+        if hints:
+            user_content += f"\nNotes: {hints}"
+        return self._parse_with_retry(settings.RESEARCH_MODEL, [
+            {"role": "system", "content": self.SYSTEM_INSTRUCTION},
+            {"role": "user", "content": user_content}
+        ], CoreResearchResponse)
+
+    def _adapt_core_response(self, entry: Dict[str, Any], slide_title: str) -> Dict[str, Any]:
+        prior = json.dumps(entry["result"], ensure_ascii=False)
+        return self._parse_with_retry(settings.RESEARCH_ADAPT_MODEL, [
+            {"role": "system", "content": self.SYSTEM_INSTRUCTION},
+            {"role": "user", "content": (
+                f"以下は類似テーマ「{entry['title']}」の共通原稿です。"
+                f"テーマ「{slide_title}」に合わせて、必要な箇所のみ調整して出力してください。\n"
+                f"既存原稿: {prior}"
+            )}
+        ], CoreResearchResponse)
+
+    def _fetch_tailored_response(
+        self,
+        core: Dict[str, Any],
+        slide_title: str,
+        audience: str,
+        goals: List[str],
+        hints: str = None
+    ) -> Dict[str, Any]:
+        user_content = (
+            f"テーマ「{slide_title}」の共通原稿をもとに、受講者と学習目標に合わせた"
+            "conclusion（受講者に合わせた語り口）・pitfalls・action_item・mini_work を作成してください。\n"
+            f"共通原稿: {json.dumps(core, ensure_ascii=False)}\nAudience: {audience}\nGoals: {', '.join(goals)}"
+        )
+        if hints:
+            user_content += f"\nNotes: {hints}"
+        return self._parse_with_retry(settings.RESEARCH_TAILOR_MODEL, [
+            {"role": "system", "content": self.SYSTEM_INSTRUCTION},
+            {"role": "user", "content": user_content}
+        ], TailoredResearchResponse)
+
+    def _adapt_ai_response(self, entry: Dict[str, Any], slide_title: str, audience: str, goals: List[str]) -> Dict[str, Any]:
+        prior = json.dumps(entry["result"], ensure_ascii=False)
+        return self._parse_with_retry(settings.RESEARCH_ADAPT_MODEL, [
+            {"role": "system", "content": self.SYSTEM_INSTRUCTION},
+            {"role": "user", "content": (
+                f"以下は類似テーマ「{entry['title']}」の既存原稿です。"
+                f"テーマ「{slide_title}」に合わせて、必要な箇所のみ調整して出力してください。\n"
+                f"既存原稿: {prior}\nAudience: {audience}\nGoals: {', '.join(goals)}"
+            )}
+        ])
+
+    def _parse_with_retry(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        response_format: Type[BaseModel] = SlideResponse
+    ) -> Dict[str, Any]:
         max_retries = 3
         for attempt in range(max_retries):
             try:
                 completion = self.client.beta.chat.completions.parse(
-                    model=GPT_MODEL,
-                    messages=[
-                        {"role": "system", "content": self.SYSTEM_INSTRUCTION},
-                        {"role": "user", "content": f"Title: {slide_title}\nAudience: {audience}\nGoals: {', '.join(goals)}"}
-                    ],
-                    response_format=SlideResponse,
+                    model=model,
+                    messages=messages,
+                    response_format=response_format,
                 )
                 parsed_data = completion.choices[0].message.parsed
                 return parsed_data.model_dump() if parsed_data else {}
@@ -125,4 +326,4 @@ class ResearchService:
                 else:
                     raise RuntimeError(f"API Rate Limit exceeded after retries: {e}")
             except Exception as e:
-                raise RuntimeError(f"API Error: {e}")
\ No newline at end of file
+                raise RuntimeError(f"API Error: {e}")
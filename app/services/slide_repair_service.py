@@ -0,0 +1,145 @@
+import re
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+LAYOUT_TYPES = ("A", "B", "C", "D", "E")
+SLIDE_TYPES = ("表紙", "本文", "要約")
+MIN_ITEMS = 2
+MAX_ITEMS = 4
+
+MARKDOWN_HEADING_PATTERN = re.compile(r"^\s*#+\s+")
+MARKDOWN_EMPHASIS_PATTERN = re.compile(r"(\*\*|__)(?=\S)(.+?)(?<=\S)\1")
+BULLET_PATTERN = re.compile(r"^\s*(?:[-・•*]\s+|\d+[.)．]\s+)")
+SENTENCE_PATTERN = re.compile(r"[^。！？\n]+[。！？]?")
+
+
+class UnrecoverableLayoutError(ValueError):
+    pass
+
+
+# LLM のレイアウト出力をスキーマに合わせて決定的に補正する。
+# 補正できない場合のみ UnrecoverableLayoutError を送出し、呼び出し側で再生成する。
+class SlideRepairService:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {"clean": 0, "repaired": 0, "recalled": 0, "failed": 0}
+
+    def repair_response(self, raw: Dict[str, Any], slide_title: Optional[str] = None, pages: int = 2) -> Tuple[Dict[str, Any], List[str]]:
+        slides = [s for s in (raw or {}).get("slides", []) if isinstance(s, dict)]
+        fixes = []
+
+        if len(slides) < pages:
+            raise UnrecoverableLayoutError(f"スライド数不足 ({len(slides)}/{pages})")
+        if len(slides) > pages:
+            fixes.append(f"slides:{len(slides)}->{pages}")
+            slides = slides[:pages]
+
+        repaired = []
+        for page_num, slide in enumerate(slides, start=1):
+            fixed_slide, slide_fixes = self.repair_slide(slide, slide_title)
+            repaired.append(fixed_slide)
+            fixes.extend(f"p{page_num}.{fix}" for fix in slide_fixes)
+
+        return {"slides": repaired}, fixes
+
+    def repair_slide(self, slide: Dict[str, Any], slide_title: Optional[str] = None) -> Tuple[Dict[str, Any], List[str]]:
+        fixes = []
+
+        slide_type = slide.get("type")
+        if slide_type not in SLIDE_TYPES:
+            slide_type = "本文"
+            fixes.append("type")
+
+        title = self._clean_text(slide.get("title", ""))
+        if slide_title and title != slide_title:
+            title = slide_title
+            fixes.append("title")
+
+        subtitle = self._clean_text(slide.get("subtitle", ""))
+
+        raw_items = slide.get("text_content") or []
+        if isinstance(raw_items, str):
+            raw_items = [raw_items]
+        items = []
+        for raw in raw_items:
+            text, bullets = BULLET_PATTERN.subn("", str(raw or ""))
+            if bullets:
+                fixes.append("bullet")
+            cleaned = self._clean_text(text)
+            if cleaned != text.strip():
+                fixes.append("markdown")
+            if cleaned:
+                items.append(cleaned)
+        if len(items) != len(raw_items):
+            fixes.append("empty_items")
+
+        if len(items) < MIN_ITEMS:
+            items = self._split_items(items)
+            if len(items) < MIN_ITEMS:
+                raise UnrecoverableLayoutError("本文項目が不足しています。")
+            fixes.append("split")
+
+        if len(items) > MAX_ITEMS:
+            fixes.append(f"merge:{len(items)}->{MAX_ITEMS}")
+            items = self._merge_items(items, MAX_ITEMS)
+
+        layout_type = str(slide.get("layout_type", "")).strip().upper()
+        if layout_type not in LAYOUT_TYPES:
+            fixes.append(f"layout:{layout_type or '-'}->C")
+            layout_type = "C"
+
+        remapped = self._remap_layout(layout_type, len(items))
+        if remapped != layout_type:
+            fixes.append(f"layout:{layout_type}->{remapped}")
+            layout_type = remapped
+
+        return {
+            **slide,
+            "type": slide_type,
+            "title": title,
+            "subtitle": subtitle,
+            "text_content": items,
+            "layout_type": layout_type
+        }, fixes
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        total = stats["clean"] + stats["repaired"]
+        stats["repair_rate"] = round(stats["repaired"] / total, 3) if total else 0.0
+        return stats
+
+    def _remap_layout(self, layout_type: str, count: int) -> str:
+        if layout_type == "E" and count != 3:
+            return "B"
+        if layout_type == "B" and count == 3:
+            return "E"
+        return layout_type
+
+    def _split_items(self, items: List[str]) -> List[str]:
+        sentences = [m.group(0).strip() for text in items for m in SENTENCE_PATTERN.finditer(text)]
+        sentences = [s for s in sentences if s]
+        if len(sentences) > MAX_ITEMS:
+            sentences = self._merge_items(sentences, MAX_ITEMS)
+        return sentences
+
+    def _merge_items(self, items: List[str], limit: int) -> List[str]:
+        items = list(items)
+        while len(items) > limit:
+            idx = min(range(len(items) - 1), key=lambda i: len(items[i]) + len(items[i + 1]))
+            items[idx:idx + 2] = [f"{items[idx]}\n{items[idx + 1]}"]
+        return items
+
+    def _clean_text(self, text: Any) -> str:
+        text = MARKDOWN_HEADING_PATTERN.sub("", str(text or ""))
+        return MARKDOWN_EMPHASIS_PATTERN.sub(self._unwrap_emphasis, text).strip()
+
+    def _unwrap_emphasis(self, match: "re.Match") -> str:
+        # __init__ のような識別子は強調記法として扱わない
+        if match.group(1) == "__" and match.group(2).isidentifier():
+            return match.group(0)
+        return match.group(2)
@@ -1,12 +1,19 @@
 import json
 import logging
 import copy
-from typing import List, Dict, Any, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Union, Tuple
 import pandas as pd
 
+from app.core.config import settings
+
 from app.services.research_service import ResearchService
 from app.services.ppt_composer_service import PPTComposerService
 from app.services.google_slides_service import GoogleSlidesService
+from app.services.pptx_render_service import PptxRenderService
+from app.services.presentation_store import PresentationStore
+from app.services.memory_monitor import RSSMonitor
 
 logger = logging.getLogger(__name__)
 
@@ -29,12 +36,21 @@ class SlideWorkflowService:
         goals_list: List[str],
         research_service: ResearchService,
         composer_service: PPTComposerService,
-        google_service: GoogleSlidesService
+        slide_service: Union[GoogleSlidesService, PptxRenderService],
+        presentation_id: Optional[str] = None,
+        presentation_store: Optional[PresentationStore] = None,
+        draft: bool = False,
+        use_index: bool = True
     ):
+        monitor = RSSMonitor().start()
         try:
+            if presentation_id and not hasattr(slide_service, "update_presentation_from_json"):
+                yield json.dumps({"status": "error", "message": "この出力形式は差分更新に対応していません。"}, ensure_ascii=False) + "\n"
+                return
+
             research_results = []
             
-            for update in research_service.run_research(df, unit_no, unit_title, audience, goals_list):
+            for update in research_service.run_research(df, unit_no, unit_title, audience, goals_list, draft=draft, use_index=use_index):
                 if update.get("status") == "complete":
                     research_results = update.get("data", [])
                 yield json.dumps(update, ensure_ascii=False) + "\n"
@@ -52,7 +68,7 @@ class SlideWorkflowService:
             final_composition = []
             temp_collected = []
 
-            for design_update in composer_service.run_composition(research_results):
+            for design_update in composer_service.run_composition(research_results, draft=draft):
                 if design_update.get("status") == "progress" and "data" in design_update:
                     temp_collected.append(design_update["data"])
                 
@@ -72,25 +88,591 @@ class SlideWorkflowService:
 
             logger.info(f"Final composition count: {len(final_composition)}")
 
-            yield json.dumps({
-                "status": "progress", 
-                "message": f"🚀 テストで検証されたロジックで {len(final_composition)}枚のスライドを作成します。", 
-                "percent": 90
-            }, ensure_ascii=False) + "\n"
-            
-            pres_id, pres_url = google_service.create_presentation_from_json(final_composition)
+            queue_stats = slide_service.queue_stats() if hasattr(slide_service, "queue_stats") else {}
+            if queue_stats.get("queue_depth"):
+                yield json.dumps({
+                    "status": "progress",
+                    "message": f"⏳ Googleスライドへの書き込み待ち: {queue_stats['queue_depth']}件",
+                    "percent": 90
+                }, ensure_ascii=False) + "\n"
+
+            if presentation_id:
+                yield json.dumps({
+                    "status": "progress", 
+                    "message": "🔁 既存のスライドと比較して、変更された部分のみ更新します。", 
+                    "percent": 90
+                }, ensure_ascii=False) + "\n"
+
+                stored = presentation_store.load(presentation_id) if presentation_store else None
+                previous_composition = stored.get("composition") if stored else None
+                pres_id, pres_url, update_summary = slide_service.update_presentation_from_json(
+                    presentation_id, final_composition, previous_composition
+                )
+            else:
+                yield json.dumps({
+                    "status": "progress", 
+                    "message": f"🚀 テストで検証されたロジックで {len(final_composition)}枚のスライドを作成します。", 
+                    "percent": 90
+                }, ensure_ascii=False) + "\n"
+
+                pres_id, pres_url = slide_service.create_presentation_from_json(final_composition)
+                update_summary = None
+
+            if presentation_store and pres_id:
+                # 後からのアップグレード・再生成のために生成条件と Research 結果も保存する
+                presentation_store.save(
+                    pres_id,
+                    composition=final_composition,
+                    output_format=slide_service.OUTPUT_FORMAT,
+                    topics=SlideWorkflowService._safe_serialize(research_results),
+                    unit_no=unit_no,
+                    unit_title=unit_title,
+                    audience=audience,
+                    goals_list=goals_list,
+                    draft=draft
+                )
             
-            yield json.dumps({
+            complete_event = {
                 "status": "complete",
-                "message": "Googleスライドの作成が完了!",
+                "message": slide_service.COMPLETE_MESSAGE,
                 "url": pres_url,
                 "presentation_id": pres_id,
+                "output_format": slide_service.OUTPUT_FORMAT,
+                "draft": draft,
                 "data": final_composition 
-            }, ensure_ascii=False) + "\n"
+            }
+            if update_summary is not None:
+                complete_event["update_summary"] = update_summary
+            if hasattr(slide_service, "queue_stats"):
+                complete_event["slides_queue"] = slide_service.queue_stats()
+            complete_event["memory"] = monitor.report()
+
+            yield json.dumps(complete_event, ensure_ascii=False) + "\n"
 
         except Exception as e:
             logger.error(f"Pipeline Critical Error: {str(e)}", exc_info=True)
             yield json.dumps({
                 "status": "error", 
                 "message": f"システム処理中にエラーが発生しました: {str(e)}"
-            }, ensure_ascii=False) + "\n"
\ No newline at end of file
+            }, ensure_ascii=False) + "\n"
+        finally:
+            monitor.stop()
+
+    @staticmethod
+    def _process_topic(
+        item: Dict[str, Any],
+        idx: int,
+        audience: str,
+        goals_list: List[str],
+        research_service: ResearchService,
+        composer_service: PPTComposerService,
+        draft: bool = False,
+        use_index: bool = True
+    ) -> Dict[str, Any]:
+        errors = []
+        if draft and settings.DRAFT_SKIP_RESEARCH:
+            item = {**item, "research_model": None, "draft": True}
+        else:
+            try:
+                research, _ = research_service.get_research(item['slide_title'], audience, goals_list, draft, use_index)
+                item = {**item, **research}
+            except Exception as e:
+                errors.append(f"スライド. '{item.get('slide_title')}' 処理失敗: {str(e)}")
+
+        topic_id = item.get('slide_number', idx + 1)
+        model = settings.DRAFT_MODEL if draft else settings.DESIGN_MODEL
+        slides = []
+        try:
+            slides = composer_service.build_topic_slides(topic_id, composer_service.get_design_response(item, model), draft)
+        except Exception as e:
+            errors.append(f"{topic_id}項目 デザインエラー: {str(e)}")
+
+        return {
+            "title": item.get('slide_title', 'タイトルなし'),
+            "topic_id": topic_id,
+            "item": item,
+            "slides": slides,
+            "errors": errors,
+            "model": model
+        }
+
+    # 大規模ユニット向け。トピック単位で Research → 設計 → アップロードを順に流し、
+    # 処理済みのスライドは保持せずに解放する。同時に保持するトピック数は window 件まで。
+    # presentation_store を渡した場合は、アップグレード・再生成用に構成と Research 結果をトピックごとに追記保存する。
+    @staticmethod
+    async def run_streaming_pipeline(
+        df: pd.DataFrame,
+        unit_no: int,
+        unit_title: str,
+        audience: str,
+        goals_list: List[str],
+        research_service: ResearchService,
+        composer_service: PPTComposerService,
+        slide_service: Union[GoogleSlidesService, PptxRenderService],
+        presentation_store: Optional[PresentationStore] = None,
+        max_workers: int = None,
+        window: Optional[int] = None,
+        draft: bool = False,
+        use_index: bool = True
+    ):
+        monitor = RSSMonitor().start()
+        draft_id = None
+        try:
+            filtered_df = research_service.filter_dataframe(df, unit_no, unit_title)
+            del df
+
+            total = len(filtered_df)
+            if total == 0:
+                yield json.dumps({"status": "error", "message": "一致するユニットが見つかりません。"}, ensure_ascii=False) + "\n"
+                return
+
+            columns = list(filtered_df.columns)
+            rows = (
+                {col: (v.item() if hasattr(v, "item") else v) for col, v in zip(columns, values)}
+                for values in filtered_df.itertuples(index=False, name=None)
+            )
+            first_item = next(rows)
+
+            cover = composer_service.create_cover_slide(first_item)
+            handle = slide_service.begin_presentation(slide_service.presentation_title([cover]))
+            slide_service.append_slides(handle, [cover])
+            slide_ids = [cover["slide_id"]]
+            if presentation_store:
+                draft_id = presentation_store.begin()
+                presentation_store.append(draft_id, composition=SlideWorkflowService._safe_serialize([cover]))
+            yield json.dumps({"status": "progress", "message": "表紙デザイン完了", "percent": 0}, ensure_ascii=False) + "\n"
+
+            window = max(1, window or settings.STREAMING_WINDOW)
+            completed_count = 0
+            last_topic_id = total
+
+            with ThreadPoolExecutor(max_workers=max_workers or settings.LLM_MAX_WORKERS) as executor:
+                pending = deque()
+
+                def submit(idx, item):
+                    pending.append(executor.submit(
+                        SlideWorkflowService._process_topic,
+                        item, idx, audience, goals_list, research_service, composer_service, draft, use_index
+                    ))
+
+                submit(0, first_item)
+                next_idx = 1
+
+                while pending:
+                    while len(pending) < window:
+                        item = next(rows, None)
+                        if item is None:
+                            break
+                        submit(next_idx, item)
+                        next_idx += 1
+
+                    topic = pending.popleft().result()
+                    completed_count += 1
+                    last_topic_id = topic["topic_id"]
+
+                    for message in topic["errors"]:
+                        yield json.dumps({"status": "error", "message": message}, ensure_ascii=False) + "\n"
+
+                    if topic["slides"]:
+                        slide_service.append_slides(handle, topic["slides"])
+                        slide_ids.extend(s["slide_id"] for s in topic["slides"])
+                    if presentation_store:
+                        presentation_store.append(
+                            draft_id,
+                            composition=SlideWorkflowService._safe_serialize(topic["slides"]),
+                            topics=SlideWorkflowService._safe_serialize([topic["item"]])
+                        )
+
+                    yield json.dumps({
+                        "status": "progress",
+                        "message": f"🎨 [{completed_count}/{total}] '{topic['title']}' 作成完了 ({topic['model']})",
+                        "percent": int((completed_count / total) * 95),
+                        "model": topic["model"]
+                    }, ensure_ascii=False) + "\n"
+                    del topic
+
+            del filtered_df
+
+            try:
+                summary_model = settings.DRAFT_MODEL if draft else settings.SUMMARY_MODEL
+                summary = composer_service.get_summary_response(last_topic_id, summary_model, draft=draft)
+                slide_service.append_slides(handle, [summary])
+                slide_ids.append(summary["slide_id"])
+                if presentation_store:
+                    presentation_store.append(draft_id, composition=SlideWorkflowService._safe_serialize([summary]))
+                yield json.dumps({
+                    "status": "progress",
+                    "message": f"📝最終要約スライド 完了 ({summary_model})",
+                    "percent": 95,
+                    "model": summary_model
+                }, ensure_ascii=False) + "\n"
+            except Exception as e:
+                yield json.dumps({"status": "error", "message": f"要約スライドの作成に失敗: {str(e)}"}, ensure_ascii=False) + "\n"
+
+            pres_id, pres_url = slide_service.finish_presentation(handle)
+
+            if presentation_store and pres_id:
+                presentation_store.finish(
+                    draft_id,
+                    pres_id,
+                    output_format=slide_service.OUTPUT_FORMAT,
+                    unit_no=unit_no,
+                    unit_title=unit_title,
+                    audience=audience,
+                    goals_list=goals_list,
+                    draft=draft
+                )
+
+            complete_event = {
+                "status": "complete",
+                "message": slide_service.COMPLETE_MESSAGE,
+                "url": pres_url,
+                "presentation_id": pres_id,
+                "output_format": slide_service.OUTPUT_FORMAT,
+                "draft": draft,
+                "slide_ids": slide_ids,
+                "reuse_stats": research_service.reuse_summary(),
+                "repair_stats": composer_service.repairer.summary(),
+                "prompt_stats": composer_service.projector.summary()
+            }
+            if hasattr(slide_service, "queue_stats"):
+                complete_event["slides_queue"] = slide_service.queue_stats()
+            complete_event["memory"] = monitor.report()
+
+            yield json.dumps(complete_event, ensure_ascii=False) + "\n"
+
+        except Exception as e:
+            logger.error(f"Streaming Pipeline Critical Error: {str(e)}", exc_info=True)
+            yield json.dumps({
+                "status": "error", 
+                "message": f"システム処理中にエラーが発生しました: {str(e)}"
+            }, ensure_ascii=False) + "\n"
+        finally:
+            if draft_id:
+                # finish() 済みなら何もしない。途中で終了した場合の追記分を削除する
+                presentation_store.discard(draft_id)
+            monitor.stop()
+    # 下書きで作成したスライドを本番モデルで作り直し、差分更新で該当トピックのページのみ置き換える。
+    # slide_ids を省略した場合は、下書きモデルで作成されたトピックをすべて対象にする。
+    @staticmethod
+    async def run_upgrade_pipeline(
+        presentation_id: str,
+        slide_ids: Optional[List[str]],
+        research_service: ResearchService,
+        composer_service: PPTComposerService,
+        slide_service: GoogleSlidesService,
+        presentation_store: PresentationStore,
+        max_workers: int = None
+    ):
+        try:
+            stored = presentation_store.load(presentation_id)
+            if not stored or not stored.get("topics") or not stored.get("composition"):
+                yield json.dumps({"status": "error", "message": "保存された生成条件が見つかりません。"}, ensure_ascii=False) + "\n"
+                return
+            if not hasattr(slide_service, "update_presentation_from_json"):
+                yield json.dumps({"status": "error", "message": "この出力形式は差分更新に対応していません。"}, ensure_ascii=False) + "\n"
+                return
+
+            composition = stored["composition"]
+            topics = stored["topics"]
+            audience = stored.get("audience", "")
+            goals_list = stored.get("goals_list", [])
+            wanted = {SlideWorkflowService._topic_key(s) for s in slide_ids} if slide_ids else None
+
+            targets = []
+            for idx, item in enumerate(topics):
+                topic_key = str(item.get('slide_number', idx + 1))
+                if wanted is not None:
+                    selected = topic_key in wanted
+                else:
+                    selected = SlideWorkflowService._is_draft_topic(item, topic_key, composition)
+                if selected:
+                    targets.append((idx, item))
+
+            summary_slide = next((s for s in composition if s.get("type") == "要約"), None)
+            upgrade_summary = summary_slide is not None and (
+                SlideWorkflowService._topic_key(summary_slide["slide_id"]) in wanted if wanted is not None
+                else bool(summary_slide.get("draft"))
+            )
+
+            if not targets and not upgrade_summary:
+                yield json.dumps({"status": "error", "message": "アップグレード対象のスライドがありません。"}, ensure_ascii=False) + "\n"
+                return
+
+            yield json.dumps({
+                "status": "progress",
+                "message": f"⬆️ {len(targets)}件のトピックを {settings.DESIGN_MODEL} で作り直します。",
+                "percent": 0
+            }, ensure_ascii=False) + "\n"
+
+            new_topics = list(topics)
+            replacements = {}
+            total = len(targets)
+
+            with ThreadPoolExecutor(max_workers=max_workers or settings.LLM_MAX_WORKERS) as executor:
+                future_to_idx = {
+                    executor.submit(
+                        SlideWorkflowService._upgrade_topic,
+                        item, idx, audience, goals_list, research_service, composer_service
+                    ): idx
+                    for idx, item in targets
+                }
+
+                completed_count = 0
+                for future in as_completed(future_to_idx):
+                    idx = future_to_idx[future]
+                    completed_count += 1
+                    try:
+                        item, slides = future.result()
+                    except Exception as e:
+                        yield json.dumps({"status": "error", "message": f"{topics[idx].get('slide_title')} アップグレード失敗: {str(e)}"}, ensure_ascii=False) + "\n"
+                        continue
+
+                    new_topics[idx] = item
+                    replacements[str(item.get('slide_number', idx + 1))] = slides
+                    yield json.dumps({
+                        "status": "progress",
+                        "message": f"🎨 [{completed_count}/{total}] '{item.get('slide_title', 'タイトルなし')}' 作成完了 ({settings.DESIGN_MODEL})",
+                        "percent": int((completed_count / total) * 80),
+                        "model": settings.DESIGN_MODEL
+                    }, ensure_ascii=False) + "\n"
+
+            new_composition = SlideWorkflowService._replace_topics(composition, replacements)
+
+            if upgrade_summary:
+                try:
+                    summary = SlideWorkflowService._rebuild_summary(composer_service, summary_slide, len(topics))
+                    new_composition = [summary if s is summary_slide else s for s in new_composition]
+                    yield json.dumps({
+                        "status": "progress",
+                        "message": f"📝最終要約スライド 完了 ({settings.SUMMARY_MODEL})",
+                        "percent": 85,
+                        "model": settings.SUMMARY_MODEL
+                    }, ensure_ascii=False) + "\n"
+                except Exception as e:
+                    yield json.dumps({"status": "error", "message": f"要約スライドの作成に失敗: {str(e)}"}, ensure_ascii=False) + "\n"
+
+            yield json.dumps({
+                "status": "progress",
+                "message": "🔁 変更されたスライドのみ更新します。",
+                "percent": 90
+            }, ensure_ascii=False) + "\n"
+
+            complete_event = SlideWorkflowService._apply_update(
+                presentation_id, composition, new_composition, new_topics, slide_service, presentation_store
+            )
+            yield json.dumps(complete_event, ensure_ascii=False) + "\n"
+
+        except Exception as e:
+            logger.error(f"Upgrade Pipeline Critical Error: {str(e)}", exc_info=True)
+            yield json.dumps({
+                "status": "error",
+                "message": f"システム処理中にエラーが発生しました: {str(e)}"
+            }, ensure_ascii=False) + "\n"
+
+    # 1トピック(または1ページ)のみを保存済みの入力から作り直し、差分更新で該当ページのみ置き換える。
+    # research=True の場合は Research から、それ以外は設計のみをやり直す。
+    @staticmethod
+    async def run_regeneration_pipeline(
+        presentation_id: str,
+        slide_id: str,
+        research_service: ResearchService,
+        composer_service: PPTComposerService,
+        slide_service: GoogleSlidesService,
+        presentation_store: PresentationStore,
+        hints: Optional[str] = None,
+        research: bool = False
+    ):
+        try:
+            stored = presentation_store.load(presentation_id)
+            if not stored or not stored.get("topics") or not stored.get("composition"):
+                yield json.dumps({"status": "error", "message": "保存された生成条件が見つかりません。"}, ensure_ascii=False) + "\n"
+                return
+            if not hasattr(slide_service, "update_presentation_from_json"):
+                yield json.dumps({"status": "error", "message": "この出力形式は差分更新に対応していません。"}, ensure_ascii=False) + "\n"
+                return
+
+            composition = stored["composition"]
+            topics = stored["topics"]
+            topic_key = SlideWorkflowService._topic_key(slide_id)
+            page_only = "-" in str(slide_id)
+
+            if page_only:
+                target = next((s for s in composition if s.get("slide_id") == slide_id), None)
+            else:
+                # 要約スライドはトピック番号のみ ("11") でも指定できる
+                target = next(
+                    (s for s in composition
+                     if s.get("type") == "要約" and SlideWorkflowService._topic_key(s["slide_id"]) == topic_key),
+                    None
+                )
+            if page_only and target is None:
+                yield json.dumps({"status": "error", "message": f"スライド {slide_id} が見つかりません。"}, ensure_ascii=False) + "\n"
+                return
+
+            new_topics = list(topics)
+
+            if target is not None and target.get("type") == "要約":
+                yield json.dumps({"status": "progress", "message": f"📝 要約スライド {target['slide_id']} を作り直します。", "percent": 10}, ensure_ascii=False) + "\n"
+                summary = SlideWorkflowService._rebuild_summary(composer_service, target, len(topics), hints)
+                new_composition = [summary if s is target else s for s in composition]
+            else:
+                idx = next(
+                    (i for i, item in enumerate(topics) if str(item.get('slide_number', i + 1)) == topic_key),
+                    None
+                )
+                if idx is None:
+                    yield json.dumps({"status": "error", "message": f"トピック {topic_key} が見つかりません。"}, ensure_ascii=False) + "\n"
+                    return
+
+                item = topics[idx]
+                if research:
+                    yield json.dumps({"status": "progress", "message": f"🔎 '{item.get('slide_title')}' の Research をやり直します。", "percent": 10}, ensure_ascii=False) + "\n"
+                    # 編集者の指示を反映させるため、索引は参照せずに取得し直す
+                    result, _ = research_service.get_research(
+                        item['slide_title'], stored.get("audience", ""), stored.get("goals_list", []),
+                        use_index=False, hints=hints
+                    )
+                    item = SlideWorkflowService._safe_serialize({**item, **result})
+                    new_topics[idx] = item
+
+                yield json.dumps({
+                    "status": "progress",
+                    "message": f"🎨 '{item.get('slide_title')}' を {settings.DESIGN_MODEL} で設計し直します。",
+                    "percent": 50,
+                    "model": settings.DESIGN_MODEL
+                }, ensure_ascii=False) + "\n"
+                slides = composer_service.build_topic_slides(
+                    item.get('slide_number', idx + 1),
+                    composer_service.get_design_response(item, settings.DESIGN_MODEL, hints)
+                )
+                if page_only:
+                    slides = [s for s in slides if s["slide_id"] == slide_id]
+                    if not slides:
+                        yield json.dumps({"status": "error", "message": f"新しい設計にページ {slide_id} が含まれていません。"}, ensure_ascii=False) + "\n"
+                        return
+                    new_composition = [slides[0] if s is target else s for s in composition]
+                else:
+                    new_composition = SlideWorkflowService._replace_topics(composition, {topic_key: slides})
+
+            yield json.dumps({
+                "status": "progress",
+                "message": "🔁 変更されたスライドのみ更新します。",
+                "percent": 90
+            }, ensure_ascii=False) + "\n"
+
+            complete_event = SlideWorkflowService._apply_update(
+                presentation_id, composition, new_composition, new_topics, slide_service, presentation_store
+            )
+            yield json.dumps(complete_event, ensure_ascii=False) + "\n"
+
+        except Exception as e:
+            logger.error(f"Regeneration Pipeline Critical Error: {str(e)}", exc_info=True)
+            yield json.dumps({
+                "status": "error",
+                "message": f"システム処理中にエラーが発生しました: {str(e)}"
+            }, ensure_ascii=False) + "\n"
+
+    @staticmethod
+    def _apply_update(
+        presentation_id: str,
+        composition: List[Dict[str, Any]],
+        new_composition: List[Dict[str, Any]],
+        new_topics: List[Dict[str, Any]],
+        slide_service: GoogleSlidesService,
+        presentation_store: PresentationStore
+    ) -> Dict[str, Any]:
+        pres_id, pres_url, update_summary = slide_service.update_presentation_from_json(
+            presentation_id, new_composition, composition
+        )
+        presentation_store.save(pres_id, composition=new_composition, topics=new_topics)
+
+        complete_event = {
+            "status": "complete",
+            "message": slide_service.COMPLETE_MESSAGE,
+            "url": pres_url,
+            "presentation_id": pres_id,
+            "output_format": slide_service.OUTPUT_FORMAT,
+            "update_summary": update_summary,
+            "models": {s["slide_id"]: s.get("model") for s in new_composition if s.get("model")},
+            "data": new_composition
+        }
+        if hasattr(slide_service, "queue_stats"):
+            complete_event["slides_queue"] = slide_service.queue_stats()
+        return complete_event
+
+    @staticmethod
+    def _rebuild_summary(
+        composer_service: PPTComposerService,
+        summary_slide: Dict[str, Any],
+        topic_count: int,
+        hints: Optional[str] = None
+    ) -> Dict[str, Any]:
+        # slide_number が整数とは限らないため、既存の要約スライドの slide_id をそのまま引き継ぐ
+        summary = composer_service.get_summary_response(topic_count, settings.SUMMARY_MODEL, hints)
+        return {**summary, "slide_id": summary_slide["slide_id"]}
+
+    @staticmethod
+    def _upgrade_topic(
+        item: Dict[str, Any],
+        idx: int,
+        audience: str,
+        goals_list: List[str],
+        research_service: ResearchService,
+        composer_service: PPTComposerService
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        if item.get("draft"):
+            research, _ = research_service.get_research(item['slide_title'], audience, goals_list)
+            item = {**item, **research}
+
+        topic_id = item.get('slide_number', idx + 1)
+        slides = composer_service.build_topic_slides(
+            topic_id, composer_service.get_design_response(item, settings.DESIGN_MODEL)
+        )
+        return SlideWorkflowService._safe_serialize(item), slides
+
+    @staticmethod
+    def _is_draft_topic(item: Dict[str, Any], topic_key: str, composition: List[Dict[str, Any]]) -> bool:
+        if item.get("draft"):
+            return True
+        return any(
+            SlideWorkflowService._topic_key(s["slide_id"]) == topic_key and s.get("draft")
+            for s in composition if s.get("type") == "本文"
+        )
+
+    @staticmethod
+    def _replace_topics(composition: List[Dict[str, Any]], replacements: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        result = []
+        replaced = set()
+        for slide in composition:
+            topic_key = SlideWorkflowService._topic_key(slide["slide_id"])
+            if slide.get("type") == "本文" and topic_key in replacements:
+                if topic_key not in replaced:
+                    result.extend(replacements[topic_key])
+                    replaced.add(topic_key)
+                continue
+            result.append(slide)
+
+        # 以前の生成で設計に失敗していたトピックは、トピック番号順の位置に挿入する
+        for topic_key, slides in replacements.items():
+            if topic_key in replaced:
+                continue
+            order = SlideWorkflowService._topic_order(topic_key)
+            pos = next(
+                (i for i, s in enumerate(result)
+                 if s.get("type") != "表紙" and SlideWorkflowService._topic_order(SlideWorkflowService._topic_key(s["slide_id"])) > order),
+                len(result)
+            )
+            result[pos:pos] = slides
+        return result
+
+    @staticmethod
+    def _topic_order(topic_key: str) -> float:
+        try:
+            return float(topic_key)
+        except ValueError:
+            return float("inf")
+
+    @staticmethod
+    def _topic_key(slide_id: Any) -> str:
+        return str(slide_id).split("-")[0].strip()
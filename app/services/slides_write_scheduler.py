@@ -0,0 +1,157 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+from googleapiclient.errors import HttpError
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# 作成系の呼び出しは 5xx でも実行済みの場合があり、再試行すると重複するためクォータ超過のみ再試行する
+NON_IDEMPOTENT_RETRYABLE_STATUS = {429}
+
+
+class QuotaBucket:
+    def __init__(self, per_minute: int):
+        self.capacity = max(1, per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def wait_time(self) -> float:
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        self._refill()
+        self.tokens -= 1
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+# Slides/Drive API 呼び出しをプロセス全体で共有するキュー。
+# 種別ごとにトークンバケットでクォータを計測し、実行(run)間はラウンドロビンで公平に割り当てる。
+class SlidesWriteScheduler:
+    def __init__(
+        self,
+        quotas: Dict[str, int],
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 32.0
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._cond = threading.Condition()
+        self._buckets = {kind: QuotaBucket(per_minute) for kind, per_minute in quotas.items()}
+        self._lanes = {kind: {"rotation": deque(), "queues": {}} for kind in quotas}
+
+        self._operations = 0
+        self._retries = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def execute(
+        self,
+        request,
+        run_id: str = "default",
+        kind: str = "slides_write",
+        run_stats: Optional[Dict[str, Any]] = None,
+        idempotent: bool = True
+    ):
+        if run_stats is None:
+            run_stats = self.new_run_stats()
+        retryable = RETRYABLE_STATUS if idempotent else NON_IDEMPOTENT_RETRYABLE_STATUS
+
+        for attempt in range(self.max_retries + 1):
+            self._acquire(run_id, kind, run_stats)
+            try:
+                return request.execute()
+            except HttpError as e:
+                status = int(getattr(e.resp, "status", 0) or 0)
+                if status not in retryable or attempt == self.max_retries:
+                    raise
+
+                delay = self._backoff(attempt, e.resp.get("retry-after") if hasattr(e.resp, "get") else None)
+                logger.warning(f"Google API {status} ({kind}). Retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                with self._cond:
+                    self._retries += 1
+                    run_stats["retries"] += 1
+                time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            depth = {
+                kind: sum(len(q) for q in lane["queues"].values())
+                for kind, lane in self._lanes.items()
+            }
+            return {
+                "queue_depth": sum(depth.values()),
+                "queue_depth_by_kind": depth,
+                "active_runs": len({run_id for lane in self._lanes.values() for run_id in lane["queues"]}),
+                "operations": self._operations,
+                "retries": self._retries,
+                "avg_wait_sec": round(self._total_wait / self._operations, 3) if self._operations else 0.0,
+                "max_wait_sec": round(self._max_wait, 3)
+            }
+
+    @staticmethod
+    def new_run_stats() -> Dict[str, Any]:
+        return {"operations": 0, "retries": 0, "wait_sec": 0.0}
+
+    def _acquire(self, run_id: str, kind: str, run_stats: Dict[str, Any]) -> None:
+        ticket = object()
+        enqueued_at = time.monotonic()
+
+        with self._cond:
+            bucket = self._buckets[kind]
+            lane = self._lanes[kind]
+            queue = lane["queues"].setdefault(run_id, deque())
+            if not queue:
+                lane["rotation"].append(run_id)
+            queue.append(ticket)
+
+            while True:
+                if lane["rotation"][0] == run_id and queue[0] is ticket:
+                    wait = bucket.wait_time()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+
+            bucket.consume()
+            queue.popleft()
+            lane["rotation"].popleft()
+            if queue:
+                lane["rotation"].append(run_id)
+            else:
+                del lane["queues"][run_id]
+
+            waited = time.monotonic() - enqueued_at
+            self._operations += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+
+            run_stats["operations"] += 1
+            run_stats["wait_sec"] += waited
+
+            self._cond.notify_all()
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return min(self.backoff_max, float(retry_after))
+            except ValueError:
+                pass
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
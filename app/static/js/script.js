@@ -13,68 +13,181 @@ document.addEventListener('DOMContentLoaded', () => {
     const btnText = document.getElementById('btn-text');
     const retryArea = document.getElementById('retry-area');
 
+    const JOB_STORAGE_KEY = 'activeGenerationJob';
+    const MAX_RECONNECT = 10;
+
     form.onsubmit = async (e) => {
         e.preventDefault();
 
         setLoadingState(true);
         const formData = new FormData(e.target);
 
-        inputSection.classList.add('hidden');
-        resultSection.classList.remove('hidden');
-
-        actionArea.innerHTML = '';
-        retryArea.classList.add('hidden');
+        showResultSection();
         updateProgress(0, "サーバー接続を試行中···");
 
         try {
-            const response = await fetch('/api/v1/research/preview', {
+            const response = await fetch('/api/v1/jobs', {
                 method: 'POST',
                 body: formData
             });
 
             if (!response.ok) {
                 const errorData = await response.json();
-                throw new Error(errorData.message || `サーバーエラー (${response.status})`);
+                throw new Error(errorData.detail || errorData.message || `サーバーエラー (${response.status})`);
             }
 
-            const reader = response.body.getReader();
-            const decoder = new TextDecoder("utf-8");
-            let buffer = '';
+            const { job_id } = await response.json();
+            saveJobProgress(job_id, 0);
+            await followJob(job_id, 0);
 
-            while (true) {
-                const { value, done } = await reader.read();
-                if (done) break;
+        } catch (err) {
+            handleFatalError(err);
+        } finally {
+            setLoadingState(false);
+        }
+    };
 
-                buffer += decoder.decode(value, { stream: true });
-                const lines = buffer.split('\n');
+    const savedJob = loadJobProgress();
+    if (savedJob) {
+        setLoadingState(true);
+        showResultSection();
+        updateProgress(undefined, "前回のジョブに再接続中···");
 
-                buffer = lines.pop();
+        followJob(savedJob.jobId, savedJob.since)
+            .catch(handleFatalError)
+            .finally(() => setLoadingState(false));
+    }
+
+    async function followJob(jobId, since) {
+        let retries = 0;
+        let finished = false;
+
+        while (true) {
+            try {
+                await readJobEvents(jobId, since, (res) => {
+                    retries = 0;
+                    if (res.seq !== undefined) {
+                        since = res.seq + 1;
+                        saveJobProgress(jobId, since);
+                    }
+                    // リサーチ・構成など各段階の complete ではなく、生成結果を含む最後のイベントで完了とする
+                    if (isFinalEvent(res)) finished = true;
+                    handleStreamResponse(res);
+                });
+                if (finished) {
+                    clearJobProgress();
+                    return;
+                }
+                // 完了・エラーを受け取る前に正常終了した場合も、途中から再接続する
+                throw new Error('ジョブの完了前に接続が終了しました');
+            } catch (err) {
+                if (!err.isJobError && retries >= MAX_RECONNECT && await showFinishedJob(jobId)) {
+                    clearJobProgress();
+                    return;
+                }
+                if (err.isJobError || retries >= MAX_RECONNECT) {
+                    clearJobProgress();
+                    throw err;
+                }
+                retries += 1;
+                updateProgress(undefined, `接続が切れました。再接続中··· (${retries}/${MAX_RECONNECT})`);
+                await new Promise((resolve) => setTimeout(resolve, Math.min(1000 * 2 ** retries, 10000)));
+            }
+        }
+    }
 
-                for (const line of lines) {
-                    if (!line.trim()) continue;
+    function isFinalEvent(res) {
+        return res.status === 'complete' && (res.presentation_id !== undefined || res.output_format !== undefined);
+    }
 
-                    let res;
+    async function showFinishedJob(jobId) {
+        // 再接続を諦める前にジョブの状態を確認し、完了していれば結果を表示する
+        try {
+            const response = await fetch(`/api/v1/jobs/${jobId}`);
+            if (!response.ok) return false;
+            const state = await response.json();
+            if (state.status !== 'succeeded') return false;
+            handleStreamResponse({
+                status: 'complete',
+                message: 'スライドの作成が完了!',
+                url: state.url,
+                output_format: state.output_format
+            });
+            return true;
+        } catch (e) {
+            return false;
+        }
+    }
 
-                    try {
-                        res = JSON.parse(line);
-                    } catch (parseErr) {
-                        console.warn("JSON構文解析飛ばし:", line);
-                        continue;
-                    }
+    async function readJobEvents(jobId, since, onEvent) {
+        const response = await fetch(`/api/v1/jobs/${jobId}/events?since=${since}`);
 
-                    handleStreamResponse(res);
+        if (!response.ok) {
+            const err = new Error(`ジョブの取得に失敗しました (${response.status})`);
+            err.isJobError = response.status === 404;
+            throw err;
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder("utf-8");
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+
+            buffer = lines.pop();
+
+            for (const line of lines) {
+                if (!line.trim()) continue;
+
+                let res;
+
+                try {
+                    res = JSON.parse(line);
+                } catch (parseErr) {
+                    console.warn("JSON構文解析飛ばし:", line);
+                    continue;
                 }
+
+                onEvent(res);
             }
+        }
+    }
 
-        } catch (err) {
-            console.error("Critical Error:", err);
-            alert("エラーが発生しました:\n" + err.message);
-            inputSection.classList.remove('hidden');
-            resultSection.classList.add('hidden');
-        } finally {
-            setLoadingState(false);
+    function saveJobProgress(jobId, since) {
+        localStorage.setItem(JOB_STORAGE_KEY, JSON.stringify({ jobId, since }));
+    }
+
+    function loadJobProgress() {
+        try {
+            return JSON.parse(localStorage.getItem(JOB_STORAGE_KEY));
+        } catch (e) {
+            return null;
         }
-    };
+    }
+
+    function clearJobProgress() {
+        localStorage.removeItem(JOB_STORAGE_KEY);
+    }
+
+    function showResultSection() {
+        inputSection.classList.add('hidden');
+        resultSection.classList.remove('hidden');
+
+        actionArea.innerHTML = '';
+        retryArea.classList.add('hidden');
+    }
+
+    function handleFatalError(err) {
+        console.error("Critical Error:", err);
+        alert("エラーが発生しました:\n" + err.message);
+        inputSection.classList.remove('hidden');
+        resultSection.classList.add('hidden');
+    }
 
     function setLoadingState(isLoading) {
         submitBtn.disabled = isLoading;
@@ -106,22 +219,28 @@ document.addEventListener('DOMContentLoaded', () => {
             statusInfo.innerHTML = `<span class="text-success fw-bold">${res.message}</span>`;
 
             if (res.url) {
-                renderFinalButton(res.url);
+                renderFinalButton(res.url, res.output_format);
                 retryArea.classList.remove('hidden');
             }
         }
         else if (res.status === 'error') {
-            throw new Error(res.message);
+            const err = new Error(res.message);
+            err.isJobError = true;
+            throw err;
         }
     }
 
-    function renderFinalButton(url) {
+    function renderFinalButton(url, outputFormat) {
+        const isPptx = outputFormat === 'pptx';
+        const label = isPptx ? '📥 PPTXファイルをダウンロード' : '📊 Googleスライドを開く';
+        const target = isPptx ? '' : 'target="_blank"';
+
         actionArea.innerHTML = `
             <div class="alert alert-success d-inline-block px-5 py-4 shadow-sm mt-3 animate__animated animate__bounceIn">
                 <h4 class="alert-heading fw-bold">🎉 作成完了!</h4>
                 <p class="mb-3">下のボタンを押してスライドを確認してください。</p>
-                <a href="${url}" target="_blank" class="btn btn-success btn-lg fw-bold px-5 py-3 shadow">
-                    📊 Googleスライドを開く
+                <a href="${url}" ${target} class="btn btn-success btn-lg fw-bold px-5 py-3 shadow">
+                    ${label}
                 </a>
             </div>
         `;
@@ -0,0 +1,61 @@
+# worker.py
+# Web サーバーとは別プロセスでジョブを実行する。JOB_LOCAL_WORKERS=0 の場合はこちらを起動する。
+#   python -m app.worker --workers 4
+import argparse
+import logging
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.core.config import settings
+from app.services.job_service import JobService, create_worker_pool, run_job
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slide generation job worker")
+    parser.add_argument("--workers", type=int, default=max(1, settings.JOB_LOCAL_WORKERS))
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    job_service = JobService()
+    pool = create_worker_pool(args.workers)
+    in_flight = {}
+
+    logger.info(f"Worker started: {args.workers} processes, jobs_dir={job_service.jobs_dir}")
+    last_recovery = 0.0
+    try:
+        while True:
+            # 停止したワーカーのジョブの再投入と、保持期間を過ぎたジョブの削除を定期的に行う
+            if time.time() - last_recovery >= settings.JOB_STALE_AFTER_SEC:
+                job_service.recover(resubmit=False)
+                last_recovery = time.time()
+
+            for job_id in [j for j, future in in_flight.items() if future.done()]:
+                future = in_flight.pop(job_id)
+                # プールが壊れた場合は、実行中だったジョブを待機中に戻して新しいプールで実行し直す
+                if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+                    job_service.recover_lost(job_id)
+
+            for job_id in job_service.list_queued():
+                if job_id not in in_flight and len(in_flight) < args.workers:
+                    try:
+                        in_flight[job_id] = pool.submit(run_job, job_service.jobs_dir, job_id)
+                    except BrokenProcessPool:
+                        logger.warning("Job worker pool is broken, recreating it")
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        pool = create_worker_pool(args.workers)
+                        in_flight[job_id] = pool.submit(run_job, job_service.jobs_dir, job_id)
+
+            time.sleep(args.poll_interval)
+    except KeyboardInterrupt:
+        pool.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# pipeline_memory.py
+# 通常モードとストリーミングモードのメモリ使用量を比較する。
+# OpenAI / Google API は呼び出さず、固定サイズのダミー応答で各工程を置き換える。
+#   python -m benchmarks.pipeline_memory --topics 50 200 1000
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import pandas as pd
+
+from app.services.google_slides_service import GoogleSlidesService
+from app.services.memory_monitor import RSSMonitor
+from app.services.ppt_composer_service import PPTComposerService
+from app.services.presentation_store import PresentationStore
+from app.services.research_service import ResearchService, CoreResearchResponse, TailoredResearchResponse
+from app.services.slide_workflow_service import SlideWorkflowService
+
+UNIT_TITLE = "ビジネスマナーの基礎"
+
+
+class BenchResearchService(ResearchService):
+    def _fetch_ai_response(self, slide_title, audience, goals, model=None, hints=None):
+        return {
+            "conclusion": f"{slide_title}の要点は結論から簡潔に伝えることです。" * 2,
+            "key_messages": [f"{slide_title} の重要ポイント {i}。" * 3 for i in range(3)],
+            "case_study": "【状況】締め切り前に問題が発生した。【行動】すぐに上司へ報告した。【結果】早期に対応できた。" * 4,
+            "pitfalls": ["報告が遅れて問題が大きくなる。" * 2, "結論を最後に話してしまう。" * 2],
+            "action_item": "明日の朝会で結論から報告してみましょう。",
+            "mini_work": "最近の報告で結論を先に伝えられましたか？",
+            "split_plan": "1/2 ページ: 定義と背景。2/2 ページ: 具体的な方法と事例。" * 3,
+            "references": "[ビジネス文書の基本 / 日本ビジネス協会 / 2023 / 報連相の基本を解説]" * 10
+        }
+
+    def _fetch_core_response(self, slide_title, hints=None):
+        result = self._fetch_ai_response(slide_title, "", [])
+        return {k: result[k] for k in CoreResearchResponse.model_fields}
+
+    def _fetch_tailored_response(self, core, slide_title, audience, goals, hints=None):
+        result = self._fetch_ai_response(slide_title, audience, goals)
+        return {k: result[k] for k in TailoredResearchResponse.model_fields}
+
+
+class BenchComposerService(PPTComposerService):
+    def get_design_response(self, item, model=None, hints=None):
+        self.projector.render(item)
+        text = [f"{item['slide_title']}に関する要点の説明文です。具体的な行動につなげます。{i}" * 2 for i in range(4)]
+        return {"slides": [
+            {"type": "本文", "title": item["slide_title"], "subtitle": "定義と背景", "text_content": text, "layout_type": "D"},
+            {"type": "本文", "title": item["slide_title"], "subtitle": "実践のポイント", "text_content": text[:3], "layout_type": "E"}
+        ]}
+
+    def get_summary_response(self, last_id, model=None, hints=None, draft=False):
+        return {"slide_id": f"{last_id + 1}-1", "type": "要約", "title": "まとめ", "subtitle": "全体の振り返り",
+                "text_content": ["要点1", "要点2", "要点3"], "layout_type": "C"}
+
+
+class _Call:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        return self.result
+
+
+class _FakeSlidesApi:
+    def presentations(self):
+        return self
+
+    def create(self, body):
+        return _Call({"presentationId": "benchmark", "slides": [{"objectId": "p"}]})
+
+    def batchUpdate(self, presentationId, body):
+        return _Call({"replies": [{} for _ in body["requests"]]})
+
+
+def build_dataframe(topics: int) -> pd.DataFrame:
+    return pd.DataFrame([
+        {
+            "unit_number": 1,
+            "unit_title": UNIT_TITLE,
+            "slide_number": i + 1,
+            "slide_title": f"報告・連絡・相談の基本 その{i + 1}",
+            "memo": "講師用メモ。" * 20
+        }
+        for i in range(topics)
+    ])
+
+
+async def consume(pipeline) -> dict:
+    last = {}
+    async for line in pipeline:
+        last = json.loads(line)
+    return last
+
+
+def run_child(mode: str, topics: int) -> dict:
+    # エンドポイント・ジョブと同じく、再生成用の構成を保存する設定で計測する
+    with tempfile.TemporaryDirectory() as store_dir:
+        return _run_child(mode, topics, store_dir)
+
+
+def _run_child(mode: str, topics: int, store_dir: str) -> dict:
+    csv_bytes = build_dataframe(topics).to_csv(index=False).encode("utf-8-sig")
+    research = BenchResearchService(api_key="benchmark")
+    composer = BenchComposerService(api_key="benchmark")
+    slides = GoogleSlidesService(service=_FakeSlidesApi())
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    with RSSMonitor(interval=0.01) as monitor:
+        df = pd.read_csv(pd.io.common.BytesIO(csv_bytes), encoding="utf-8-sig")
+        del csv_bytes
+        kwargs = dict(df=df, unit_no=1, unit_title=UNIT_TITLE, audience="新入社員", goals_list=["報告"],
+                      research_service=research, composer_service=composer, slide_service=slides,
+                      presentation_store=PresentationStore(store_dir))
+        del df
+        if mode == "streaming":
+            pipeline = SlideWorkflowService.run_streaming_pipeline(**kwargs)
+        else:
+            pipeline = SlideWorkflowService.run_generation_pipeline(**kwargs)
+        del kwargs
+        last = asyncio.run(consume(pipeline))
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "mode": mode,
+        "topics": topics,
+        "status": last.get("status"),
+        "seconds": round(time.perf_counter() - started, 2),
+        "python_peak_mb": round(traced_peak / 1024 / 1024, 1),
+        "rss_peak_delta_mb": monitor.report()["peak_delta_mb"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline memory benchmark")
+    parser.add_argument("--topics", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--modes", nargs="+", default=["current", "streaming"])
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.modes[0], args.topics[0])))
+        return
+
+    print(f"{'topics':>7} {'mode':>10} {'python peak MB':>15} {'RSS delta MB':>13} {'sec':>7}")
+    for topics in args.topics:
+        for mode in args.modes:
+            # 計測ごとに別プロセスで実行し、前回のアロケーションの影響を排除する
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.pipeline_memory", "--child", "--modes", mode, "--topics", str(topics)],
+                capture_output=True, text=True, check=True
+            )
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{r['topics']:>7} {r['mode']:>10} {r['python_peak_mb']:>15} {r['rss_peak_delta_mb']:>13} {r['seconds']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# slides_transport.py
+# 同時に作成するデッキ数を増やしたときのスループットを、トランスポート別に比較する。
+#   httplib2: 従来のトランスポート。スレッド間で共有できないため、デッキごとに API クライアントを作成する
+#   pooled:   PooledHttpTransport 上の API クライアント1つを全デッキで共有する
+# Google API の代わりにローカルの疑似 Slides サーバーを起動し、接続確立とリクエスト処理に一定の遅延を入れる。
+#   python -m benchmarks.slides_transport --decks 32 --concurrency 1 4 8 16
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import httplib2
+from googleapiclient.discovery import build
+
+from app.core.config import settings
+from app.services.google_http_transport import PooledHttpTransport, build_api
+from app.services.google_slides_service import GoogleSlidesService
+from benchmarks.template_requests import build_composition
+
+
+class FakeSlidesHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connect_latency = 0.05
+    request_latency = 0.2
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        # TLS ハンドシェイクなど接続確立のコストを模擬する
+        with FakeSlidesHandler.lock:
+            FakeSlidesHandler.connections += 1
+        time.sleep(self.connect_latency)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.request_latency)
+        if self.path.endswith(":batchUpdate"):
+            self._send({"replies": [{} for _ in body.get("requests", [])]})
+        else:
+            self._send({"presentationId": uuid.uuid4().hex, "slides": [{"objectId": "p"}]})
+
+    def do_GET(self):
+        time.sleep(self.request_latency)
+        self._send({"slides": []})
+
+    def _send(self, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSlidesHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def render_deck(service_factory, composition) -> None:
+    slides = GoogleSlidesService(service=service_factory())
+    handle = slides.begin_presentation(slides.presentation_title(composition))
+    slides.append_slides(handle, composition)
+    slides.finish_presentation(handle)
+
+
+def run(mode: str, endpoint: str, decks: int, concurrency: int, topics: int) -> dict:
+    client_options = {"api_endpoint": endpoint}
+    if mode == "pooled":
+        transport = PooledHttpTransport(max_connections_per_host=concurrency, max_keepalive_per_host=concurrency)
+        shared = build_api("slides", "v1", transport, client_options=client_options)
+        service_factory = lambda: shared
+    else:
+        transport = None
+        service_factory = lambda: build("slides", "v1", http=httplib2.Http(), static_discovery=True, client_options=client_options)
+
+    composition = build_composition(topics)
+    FakeSlidesHandler.connections = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda _: render_deck(service_factory, composition), range(decks)))
+    elapsed = time.perf_counter() - started
+
+    if transport is not None:
+        transport.close()
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 2),
+        "decks_per_sec": round(decks / elapsed, 2),
+        "connections": FakeSlidesHandler.connections
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slides transport throughput benchmark")
+    parser.add_argument("--decks", type=int, default=32)
+    parser.add_argument("--topics", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--batch-requests", type=int, default=200)
+    parser.add_argument("--connect-latency", type=float, default=0.05)
+    parser.add_argument("--request-latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    settings.SLIDES_STREAM_BATCH_REQUESTS = args.batch_requests
+    FakeSlidesHandler.connect_latency = args.connect_latency
+    FakeSlidesHandler.request_latency = args.request_latency
+
+    server = start_server()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"{'concurrency':>11} {'mode':>9} {'decks/sec':>10} {'sec':>7} {'connections':>12}")
+    try:
+        for concurrency in args.concurrency:
+            for mode in ("httplib2", "pooled"):
+                r = run(mode, endpoint, args.decks, concurrency, args.topics)
+                print(f"{r['concurrency']:>11} {r['mode']:>9} {r['decks_per_sec']:>10} {r['seconds']:>7} {r['connections']:>12}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# template_requests.py
+# 座標指定モード(google)とテンプレートモード(google_template)の Slides リクエスト数・ペイロードサイズを比較する。
+# Google API は呼び出さず、テストと共通の疑似 Slides / Drive バックエンド(tests/fake_slides.py)を使う。
+#   python -m benchmarks.template_requests --topics 10 50 200
+import argparse
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.services.google_slides_service import GoogleSlidesService
+from app.services.google_slides_template_service import GoogleSlidesTemplateService
+from tests.fake_slides import FakeSlidesBackend, build_composition
+
+def run(mode: str, topics: int) -> dict:
+    backend = FakeSlidesBackend()
+    if mode == "google_template":
+        service = GoogleSlidesTemplateService(service=backend, drive_service=backend, template_id="template")
+    else:
+        service = GoogleSlidesService(service=backend)
+
+    composition = build_composition(topics)
+    service.create_presentation_from_json(composition)
+
+    assert len(backend.pages) == len(composition), (len(backend.pages), len(composition))
+    return {
+        "mode": mode,
+        "topics": topics,
+        "slides": len(composition),
+        "requests": backend.requests,
+        "payload_kb": round(backend.payload_bytes / 1024, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Template mode request-count benchmark")
+    parser.add_argument("--topics", type=int, nargs="+", default=[10, 50, 200])
+    args = parser.parse_args()
+
+    print(f"{'topics':>7} {'mode':>16} {'slides':>7} {'requests':>9} {'payload KB':>11}")
+    for topics in args.topics:
+        for mode in ("google", "google_template"):
+            r = run(mode, topics)
+            print(f"{r['topics']:>7} {r['mode']:>16} {r['slides']:>7} {r['requests']:>9} {r['payload_kb']:>11}")
+
+
+if __name__ == "__main__":
+    main()
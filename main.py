@@ -1,14 +1,23 @@
 # main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
 import uvicorn
 from app.api.v1.endpoints.slides import router as api_router
+from app.services.job_service import JobService
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI(title="Automatic Course Creation AI")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 前回の停止で取り残されたジョブを引き継ぐ
+    await run_in_threadpool(JobService().recover)
+    yield
+
+app = FastAPI(title="Automatic Course Creation AI", lifespan=lifespan)
 
 app.include_router(api_router, prefix="/api/v1")
 
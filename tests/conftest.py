@@ -0,0 +1,28 @@
+import os
+
+# app.core.config の Settings は OPENAI_API_KEY を必須とするため、import より前に設定する
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import pytest
+
+
+@pytest.fixture
+def composition():
+    return [
+        {
+            "slide_id": "0-0", "type": "表紙", "title": "Cover", "layout_type": "Cover",
+            "text_content": ["Unit 1", "ビジネスマナーの基礎", "報連相"]
+        },
+        {
+            "slide_id": "1-1", "type": "本文", "title": "報告の基本", "subtitle": "結論から伝える",
+            "layout_type": "A", "text_content": ["結論を先に伝える。", "根拠を添える。"]
+        },
+        {
+            "slide_id": "1-2", "type": "本文", "title": "報告の基本", "subtitle": "実践のポイント",
+            "layout_type": "E", "text_content": ["事実", "影響", "対応"]
+        },
+        {
+            "slide_id": "2-1", "type": "要約", "title": "まとめ", "subtitle": "全体の振り返り",
+            "layout_type": "C", "text_content": ["要点1", "要点2", "要点3"]
+        }
+    ]
@@ -0,0 +1,132 @@
+# Slides / Drive API の疑似バックエンド。テストと benchmarks/template_requests.py で使う。
+import json
+
+from app.core.config import settings
+
+# テンプレートの各レイアウトが持つプレースホルダー (type, index)
+TEMPLATE_PLACEHOLDERS = {
+    "Cover": [("CENTERED_TITLE", 0), ("SUBTITLE", 0), ("BODY", 0)],
+    "A": [("TITLE", 0), ("SUBTITLE", 0), ("BODY", 0)],
+    "B": [("TITLE", 0), ("SUBTITLE", 0), ("BODY", 0), ("BODY", 1), ("BODY", 2), ("BODY", 3)],
+    "C": [("TITLE", 0), ("SUBTITLE", 0), ("BODY", 0)],
+    "D": [("TITLE", 0), ("SUBTITLE", 0), ("BODY", 0), ("BODY", 1), ("BODY", 2), ("BODY", 3)],
+    "E": [("TITLE", 0), ("SUBTITLE", 0), ("BODY", 0), ("BODY", 1), ("BODY", 2), ("SLIDE_NUMBER", 0)],
+}
+
+
+class _Call:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        return self.result
+
+
+class FakeSlidesBackend:
+    """presentations() / files() の最小実装。存在しないオブジェクトへの操作はエラーにする。
+    pages はページの並び順を保持し、createSlide の insertionIndex と updateSlidesPosition を反映する。"""
+
+    def __init__(self):
+        self.pages = []
+        self.objects = set()
+        self.requests = 0
+        self.payload_bytes = 0
+        self.batches = 0
+
+    def presentations(self):
+        return self
+
+    def files(self):
+        return self
+
+    def create(self, body):
+        self.pages = ["p"]
+        self.objects = {"p"}
+        return _Call({"presentationId": "fake", "slides": [{"objectId": "p"}]})
+
+    def copy(self, fileId, body, fields=None):
+        self.pages = ["template_sample"]
+        self.objects = {"template_sample"}
+        return _Call({"id": "fake-copy"})
+
+    def get(self, presentationId, fields=None):
+        layouts = [
+            {
+                "objectId": f"layout_{key}",
+                "layoutProperties": {"name": f"CUSTOM_{i}", "displayName": settings.SLIDES_TEMPLATE_LAYOUTS[key]},
+                "pageElements": [
+                    {"objectId": f"layout_{key}_{t}{idx}", "shape": {"placeholder": {"type": t, "index": idx}}}
+                    for t, idx in placeholders
+                ]
+            }
+            for i, (key, placeholders) in enumerate(TEMPLATE_PLACEHOLDERS.items())
+        ]
+        return _Call({"slides": [{"objectId": pid} for pid in self.pages], "layouts": layouts})
+
+    def batchUpdate(self, presentationId, body):
+        requests = body["requests"]
+        self.batches += 1
+        self.requests += len(requests)
+        self.payload_bytes += len(json.dumps(body, ensure_ascii=False).encode("utf-8"))
+
+        for req in requests:
+            kind, params = next(iter(req.items()))
+            if kind == "createSlide":
+                if params["objectId"] in self.objects:
+                    raise ValueError(f"duplicate objectId: {params['objectId']}")
+                index = params.get("insertionIndex", len(self.pages))
+                if not 0 <= index <= len(self.pages):
+                    raise ValueError(f"insertionIndex out of range: {index}")
+                self.pages.insert(index, params["objectId"])
+                self.objects.add(params["objectId"])
+                for mapping in params.get("placeholderIdMappings", []):
+                    self.objects.add(mapping["objectId"])
+            elif kind in ("createShape",):
+                self.objects.add(params["objectId"])
+            elif kind == "updateSlidesPosition":
+                self._move(params["slideObjectIds"], params["insertionIndex"])
+            elif kind == "deleteObject":
+                self._require(params["objectId"])
+                self.objects.discard(params["objectId"])
+                if params["objectId"] in self.pages:
+                    self.pages.remove(params["objectId"])
+            elif "objectId" in params:
+                self._require(params["objectId"])
+        return _Call({"replies": [{} for _ in requests]})
+
+    def _move(self, slide_ids, insertion_index):
+        # insertionIndex は移動前の並びでの位置を指す(Slides API と同じ)
+        for pid in slide_ids:
+            if pid not in self.pages:
+                raise ValueError(f"unknown slide: {pid}")
+        if not 0 <= insertion_index <= len(self.pages):
+            raise ValueError(f"insertionIndex out of range: {insertion_index}")
+        insertion_index -= sum(1 for pid in self.pages[:insertion_index] if pid in slide_ids)
+        remaining = [pid for pid in self.pages if pid not in slide_ids]
+        self.pages = remaining[:insertion_index] + list(slide_ids) + remaining[insertion_index:]
+
+    def _require(self, object_id):
+        if object_id not in self.objects:
+            raise ValueError(f"unknown objectId: {object_id}")
+
+
+def build_composition(topics: int) -> list:
+    layouts = ["A", "B", "C", "D", "E"]
+    composition = [{
+        "slide_id": "0-0", "type": "表紙", "title": "Cover", "layout_type": "Cover",
+        "text_content": ["Unit 1", "ビジネスマナーの基礎", "報連相"]
+    }]
+    for i in range(1, topics + 1):
+        for page in (1, 2):
+            layout = layouts[(i + page) % len(layouts)]
+            count = 3 if layout == "E" else 4 if layout in ("B", "D") else 2 + (i % 3)
+            composition.append({
+                "slide_id": f"{i}-{page}", "type": "本文", "title": f"報告・連絡・相談の基本 その{i}",
+                "subtitle": "結論から伝える", "layout_type": layout,
+                "text_content": [f"要点{n}: 具体的な行動につながる短い説明文です。" for n in range(count)]
+            })
+    composition.append({
+        "slide_id": f"{topics + 1}-1", "type": "要約", "title": "まとめ", "subtitle": "全体の振り返り",
+        "layout_type": "C", "text_content": ["要点1", "要点2", "要点3"]
+    })
+    return composition
@@ -0,0 +1,113 @@
+import copy
+
+import pytest
+
+from app.core.config import settings
+from app.services import google_slides_template_service
+from app.services.google_slides_service import GoogleSlidesService
+from app.services.google_slides_template_service import GoogleSlidesTemplateService
+from tests.fake_slides import FakeSlidesBackend, build_composition
+
+
+@pytest.fixture
+def backend():
+    return FakeSlidesBackend()
+
+
+@pytest.fixture
+def service(backend):
+    return GoogleSlidesTemplateService(service=backend, drive_service=backend, template_id="template")
+
+
+def test_create_fills_template_pages(backend, service):
+    composition = build_composition(5)
+    presentation_id, url = service.create_presentation_from_json(composition)
+
+    assert presentation_id == "fake-copy"
+    assert url.endswith(presentation_id)
+    assert "template_sample" not in backend.pages
+    assert list(backend.pages) == [service._page_object_id(item) for item in composition]
+    assert backend.batches == 1
+
+
+def test_template_mode_sends_fewer_requests_than_coordinates(backend, service):
+    composition = build_composition(5)
+    service.create_presentation_from_json(composition)
+
+    coordinates = FakeSlidesBackend()
+    GoogleSlidesService(service=coordinates).create_presentation_from_json(composition)
+
+    assert len(coordinates.pages) == len(backend.pages)
+    assert backend.requests < coordinates.requests / 2
+
+
+def test_update_recreates_only_changed_pages(backend, service):
+    composition = build_composition(5)
+    presentation_id, _ = service.create_presentation_from_json(composition)
+
+    _, _, summary = service.update_presentation_from_json(presentation_id, composition, composition)
+    assert summary == {"kept": len(composition), "created": 0, "deleted": 0, "requests": 0}
+
+    changed = copy.deepcopy(composition)
+    changed[3]["text_content"][0] = "変更した要点です。"
+    batches = backend.batches
+    _, _, summary = service.update_presentation_from_json(presentation_id, changed, composition)
+
+    assert summary["kept"] == len(composition) - 1
+    assert summary["created"] == 1
+    assert summary["deleted"] == 1
+    assert backend.batches == batches + 1
+    assert backend.pages == [service._page_object_id(item) for item in changed]
+
+
+@pytest.mark.parametrize("make_service", [
+    lambda backend: GoogleSlidesService(service=backend),
+    lambda backend: GoogleSlidesTemplateService(service=backend, drive_service=backend, template_id="template"),
+], ids=["google", "google_template"])
+def test_update_applies_new_page_order(backend, make_service):
+    service = make_service(backend)
+    composition = build_composition(5)
+    presentation_id, _ = service.create_presentation_from_json(composition)
+
+    # トピックの入れ替え・途中への追加・削除を同時に行う
+    added = copy.deepcopy(composition[1])
+    added.update({"slide_id": "9-1", "title": "追加したトピック"})
+    changed = [composition[0], *composition[5:7], added, *composition[1:3], *composition[9:]]
+    _, _, summary = service.update_presentation_from_json(presentation_id, changed, composition)
+
+    assert summary["created"] == 1
+    assert summary["deleted"] == len(composition) - len(changed) + 1
+    assert backend.pages == [service._page_object_id(item) for item in changed]
+
+
+def test_streaming_flushes_in_batches(backend, service, monkeypatch):
+    monkeypatch.setattr(settings, "SLIDES_STREAM_BATCH_REQUESTS", 20)
+    composition = build_composition(10)
+
+    handle = service.begin_presentation(service.presentation_title(composition))
+    for item in composition:
+        service.append_slides(handle, [item])
+    service.finish_presentation(handle)
+
+    streamed = (backend.batches, backend.requests, len(backend.pages))
+
+    single = FakeSlidesBackend()
+    monkeypatch.setattr(settings, "SLIDES_STREAM_BATCH_REQUESTS", 10 ** 6)
+    GoogleSlidesTemplateService(service=single, drive_service=single, template_id="template") \
+        .create_presentation_from_json(composition)
+
+    assert streamed[0] > 1
+    assert streamed[1] == single.requests
+    assert streamed[2] == len(composition)
+
+
+def test_constructor_authenticates_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(GoogleSlidesTemplateService, "_authenticate", classmethod(lambda cls: calls.append(cls) or "creds"))
+    monkeypatch.setattr(google_slides_template_service, "build", lambda name, version, credentials: (name, credentials))
+
+    service = GoogleSlidesTemplateService(template_id="template")
+
+    assert len(calls) == 1
+    assert service.service == ("slides", "creds")
+    assert service.drive == ("drive", "creds")
@@ -0,0 +1,57 @@
+import os
+import socket
+import time
+
+from app.core.config import settings
+from app.services.job_service import JobService, _lock_path, _read_state, _write_state
+
+
+def _make_job(jobs_dir, job_id, state, lock=None):
+    job_dir = os.path.join(jobs_dir, job_id)
+    os.makedirs(job_dir)
+    open(os.path.join(job_dir, "events.ndjson"), "a").close()
+    _write_state(job_dir, {"job_id": job_id, "created_at": time.time(), **state})
+    if lock is not None:
+        with open(_lock_path(job_dir), "w") as f:
+            f.write(lock)
+    return job_dir
+
+
+def test_recover_lost_requeues_job_claimed_by_own_pool(tmp_path):
+    # プールのワーカーが異常終了した直後は、ハートビートの期限を待たずに再投入する
+    job_dir = _make_job(
+        str(tmp_path), "lost", {"status": "running", "attempts": 1},
+        lock=f"{socket.gethostname()}:12345:{os.getpid()}"
+    )
+
+    assert JobService(str(tmp_path)).recover_lost("lost") == "queued"
+    assert _read_state(job_dir)["status"] == "queued"
+    assert not os.path.exists(_lock_path(job_dir))
+
+
+def test_recover_lost_leaves_jobs_of_other_processes(tmp_path):
+    job_dir = _make_job(
+        str(tmp_path), "other", {"status": "running", "attempts": 1},
+        lock=f"{socket.gethostname()}:12345:{os.getpid() + 1}"
+    )
+
+    assert JobService(str(tmp_path)).recover_lost("other") is None
+    assert _read_state(job_dir)["status"] == "running"
+
+
+def test_submit_recreates_broken_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_LOCAL_WORKERS", 1)
+    monkeypatch.setattr(JobService, "_executor", None)
+    service = JobService(str(tmp_path))
+    # ロック済みのジョブは run_job が即座に返るため、プールの再作成だけを確認できる
+    _make_job(str(tmp_path), "done", {"status": "succeeded"}, lock="other")
+
+    broken = service._get_executor()
+    broken.submit(os._exit, 1).exception(timeout=60)
+
+    service._submit_local("done")
+    try:
+        assert JobService._executor is not broken
+        assert JobService._executor.submit(int, "1").result(timeout=60) == 1
+    finally:
+        JobService._executor.shutdown(wait=True)
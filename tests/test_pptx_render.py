@@ -0,0 +1,56 @@
+import os
+
+import pytest
+from pptx import Presentation
+
+from app.core.config import settings
+from app.services.pptx_render_service import PptxRenderService
+from app.services.slide_request_builder import SlideRequestBuilder
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PPTX_OUTPUT_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_render_writes_one_slide_per_item(output_dir, composition):
+    service = PptxRenderService()
+    file_id, url = service.create_presentation_from_json(composition)
+
+    path = service.get_file_path(file_id)
+    assert os.path.dirname(path) == str(output_dir)
+    assert url == f"{PptxRenderService.DOWNLOAD_PATH}/{file_id}"
+
+    prs = Presentation(path)
+    assert len(prs.slides) == len(composition)
+
+    texts = {shape.text_frame.text for slide in prs.slides for shape in slide.shapes if shape.has_text_frame}
+    assert any("報告の基本" in text for text in texts)
+    assert any("ビジネスマナーの基礎" in text for text in texts)
+
+
+def test_render_rejects_empty_composition(output_dir):
+    assert PptxRenderService().create_presentation_from_json([]) == (None, "有効なスライドデータがありません。")
+
+
+@pytest.mark.parametrize("layout_type, count", [("A", 2), ("B", 4), ("C", 3), ("D", 4), ("E", 3)])
+def test_builder_creates_each_layout_on_its_own_page(layout_type, count):
+    builder = SlideRequestBuilder()
+    item = {
+        "slide_id": "3-1", "type": "本文", "title": "報告の基本", "subtitle": "結論から伝える",
+        "layout_type": layout_type, "text_content": [f"項目{i}" for i in range(count)]
+    }
+    requests = builder.generate_slide_requests(item)
+
+    page_id = builder._page_object_id(item)
+    assert requests[0] == {"createSlide": {"objectId": page_id, "slideLayoutReference": {"predefinedLayout": "BLANK"}}}
+    assert sum("createSlide" in req for req in requests) == 1
+    assert len(requests) > 1
+
+
+def test_page_id_ignores_model_metadata(composition):
+    builder = SlideRequestBuilder()
+    item = composition[1]
+    assert builder._page_object_id(item) == builder._page_object_id({**item, "model": "gpt-4o", "draft": True})
+    assert builder._page_object_id(item) != builder._page_object_id({**item, "subtitle": "変更"})
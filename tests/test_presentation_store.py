@@ -0,0 +1,42 @@
+import os
+
+from app.services.presentation_store import PresentationStore
+
+
+def test_appended_parts_are_loaded_in_order(tmp_path):
+    store = PresentationStore(str(tmp_path))
+    draft_id = store.begin()
+    store.append(draft_id, composition=[{"slide_id": "0-0"}])
+    store.append(draft_id, composition=[{"slide_id": "1-1"}, {"slide_id": "1-2"}], topics=[{"slide_number": 1}])
+    store.append(draft_id, composition=[{"slide_id": "2-1"}])
+    store.finish(draft_id, "pres1", output_format="google_slides", draft=True)
+
+    record = store.load("pres1")
+    assert [s["slide_id"] for s in record["composition"]] == ["0-0", "1-1", "1-2", "2-1"]
+    assert record["topics"] == [{"slide_number": 1}]
+    assert record["draft"] is True
+    assert not os.path.exists(store._pending_path(draft_id))
+
+
+def test_save_folds_appended_parts(tmp_path):
+    store = PresentationStore(str(tmp_path))
+    draft_id = store.begin()
+    store.append(draft_id, composition=[{"slide_id": "0-0"}], topics=[{"slide_number": 1}])
+    store.finish(draft_id, "pres1")
+
+    store.save("pres1", composition=[{"slide_id": "0-0", "draft": False}])
+
+    record = store.load("pres1")
+    assert record["composition"] == [{"slide_id": "0-0", "draft": False}]
+    assert record["topics"] == [{"slide_number": 1}]
+    assert not os.path.exists(store._parts_path("pres1"))
+
+
+def test_discard_removes_unfinished_parts(tmp_path):
+    store = PresentationStore(str(tmp_path))
+    draft_id = store.begin()
+    store.append(draft_id, composition=[{"slide_id": "0-0"}])
+
+    store.discard(draft_id)
+
+    assert os.listdir(tmp_path) == []